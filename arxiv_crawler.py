@@ -7,16 +7,28 @@ arXiv 论文爬取和下载工具
 import requests
 import re
 import os
+import sys
 import time
 import argparse
 from urllib.parse import urljoin, urlparse
 from bs4 import BeautifulSoup
 from collections import Counter
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Sequence, Set, Union
 import logging
 from pathlib import Path
 
+from authors import AuthorIndex
+from capture import CaptureWriter, replay
+from compare import write_keyword_report
+from keywords import count_keywords
+from paper import Paper, PaperBatch, paper_to_json
+from profiling import PROFILE_MODES, StageProfiler
+from progress import PROGRESS_MODES, ProgressReporter
+from seen import SeenIdSet
+from store import PaperStore
+from watcher import CrawlWatcher
+
 # 词云相关导入
 try:
     from wordcloud import WordCloud
@@ -33,24 +45,48 @@ except ImportError:
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# 列表页解析用到的正则，在模块加载时编译一次
+_ABS_HREF = re.compile(r'/abs/')
+_DATE_PATTERN = re.compile(r'\d{4}-\d{2}-\d{2}')
+
 class ArxivCrawler:
-    def __init__(self, base_url: str = "https://arxiv.org", delay: float = 1.0):
+    def __init__(self, base_url: str = "https://arxiv.org", delay: float = 1.0,
+                 profiler: Optional[StageProfiler] = None,
+                 seen: Optional[SeenIdSet] = None, downloaded: Optional[SeenIdSet] = None,
+                 capture: Optional[CaptureWriter] = None,
+                 progress: Optional[ProgressReporter] = None):
         """
         初始化 arXiv 爬虫
         
         Args:
             base_url: arXiv 基础 URL
             delay: 请求间隔时间（秒）
+            profiler: 阶段剖析器，None 表示不剖析
+            seen: 已处理完成的论文 ID 集合，列表页中已见的条目不再解析，整页已见时停止翻页；
+                爬虫本身不写入该集合，由调用方在论文处理、保存之后再加入
+            downloaded: 已下载论文 ID 集合，已下载的论文不再安排下载
+            capture: 列表页响应录制器，None 表示不录制
+            progress: 进度汇报，None 表示只计数不输出
         """
         self.base_url = base_url
         self.delay = delay
+        self.profiler = profiler or StageProfiler()
+        self.seen = seen
+        self.downloaded = downloaded
+        self.capture = capture
+        self.progress = progress or ProgressReporter()
+        self.parse_errors = Counter()  # 按原因累计的列表页条目解析失败数
+        self.skipped_seen = 0  # 因已见而跳过的列表页条目数
+        self.skipped_listed = 0  # 因本次运行已获取而跳过的列表页条目数
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36'
         })
         
     def get_papers_from_category(self, category: str, max_papers: int = 50, 
-                                start_page: int = 0) -> List[Dict]:
+                                start_page: int = 0, period: str = "recent",
+                                raise_errors: bool = False,
+                                exclude: Optional[Set[str]] = None) -> List[Paper]:
         """
         从指定栏目获取论文列表
         
@@ -58,6 +94,9 @@ class ArxivCrawler:
             category: 栏目代码，如 'cs.AI', 'cs.CV' 等
             max_papers: 最大论文数量
             start_page: 起始页码
+            period: 列表页，'recent' 为最近论文，'2024-01' 形式为按月归档
+            raise_errors: 请求失败时抛出异常；默认记录错误并返回已获取的部分
+            exclude: 本次运行中已经获取的论文 ID，跳过但不计入"整页已见"的判断
             
         Returns:
             论文信息列表
@@ -65,142 +104,234 @@ class ArxivCrawler:
         papers = []
         page = start_page
         items_per_page = 50  # arXiv 每页显示50篇论文
+        category = sys.intern(category)
         
         logger.info(f"开始爬取栏目 {category} 的论文，目标数量: {max_papers}")
+        listing = self.progress.stage('listing', unit='page')
+        expected_pages = -(-max_papers // items_per_page)
+        listing.add_total(expected_pages)
+        fetched_pages = 0
         
         while len(papers) < max_papers:
             # 构建分页 URL
-            url = f"{self.base_url}/list/{category}/recent"
+            url = f"{self.base_url}/list/{category}/{period}"
             if page > 0:
                 url += f"?skip={page * items_per_page}"
                 
             logger.info(f"正在爬取第 {page + 1} 页: {url}")
             
             try:
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
+                with self.profiler.stage('listing'), listing.active():
+                    try:
+                        response = self.session.get(url, timeout=30)
+                        response.raise_for_status()
+                    except requests.RequestException:
+                        listing.advance(failed=True)
+                        raise
+                fetched_pages += 1
+                listing.advance(nbytes=len(response.content))
+                if self.capture is not None:
+                    self.capture.record(url, response.status_code, response.headers, response.content)
                 
-                soup = BeautifulSoup(response.content, 'html.parser')
-                page_papers = self._parse_paper_list(soup)
+                skipped_before = self.skipped_seen
+                excluded_before = self.skipped_listed
+                with self.profiler.stage('parsing'):
+                    soup = BeautifulSoup(response.content, 'html.parser')
+                    page_papers = self._parse_paper_list(soup, exclude)
+                skipped = self.skipped_seen - skipped_before
+                excluded = self.skipped_listed - excluded_before
                 
-                if not page_papers:
-                    logger.info("没有更多论文，停止爬取")
+                if not page_papers and not excluded:
+                    if skipped:
+                        # 列表按时间倒序，seen 中只有之前已处理完成的论文，
+                        # 整页都已见过说明之后的页面也在当时处理过了
+                        logger.info(f"第 {page + 1} 页的 {skipped} 篇论文均已见过，停止爬取")
+                    else:
+                        logger.info("没有更多论文，停止爬取")
                     break
                     
+                for paper in page_papers:
+                    paper.category = category
                 papers.extend(page_papers)
-                logger.info(f"第 {page + 1} 页获取到 {len(page_papers)} 篇论文，总计: {len(papers)}")
+                skipped_note = f"（跳过已见 {skipped + excluded} 篇）" if skipped or excluded else ""
+                logger.info(f"第 {page + 1} 页获取到 {len(page_papers)} 篇论文{skipped_note}，总计: {len(papers)}")
                 
                 # 如果当前页论文数少于预期，说明已经到最后一页
-                if len(page_papers) < items_per_page:
+                if len(page_papers) + skipped + excluded < items_per_page:
                     logger.info("已到达最后一页")
                     break
                     
                 page += 1
-                time.sleep(self.delay)  # 避免请求过于频繁
+                self._throttle(listing)
                 
             except requests.RequestException as e:
                 logger.error(f"请求失败: {e}")
+                if raise_errors:
+                    raise
                 break
+        
+        # 提前结束时修正预期页数，使总进度与实际一致
+        listing.add_total(fetched_pages - expected_pages)
                 
         # 限制返回的论文数量
         return papers[:max_papers]
     
-    def _parse_paper_list(self, soup: BeautifulSoup) -> List[Dict]:
-        """解析论文列表页面"""
+    def log_parse_errors(self):
+        """在运行结束时汇总列表页条目的解析失败数"""
+        if self.parse_errors:
+            logger.warning(f"本次运行共有 {sum(self.parse_errors.values())} 个列表页条目解析失败: "
+                           f"{dict(self.parse_errors)}")
+    
+    def _throttle(self, stage):
+        """请求之间按 delay 等待，等待时间计入阶段进度，用于判断是否受限速制约"""
+        if self.delay > 0:
+            time.sleep(self.delay)  # 避免请求过于频繁
+            stage.add_wait(self.delay)
+    
+    def _parse_paper_list(self, soup: BeautifulSoup,
+                          exclude: Optional[Set[str]] = None) -> List[Paper]:
+        """
+        解析论文列表页面
+        
+        单遍遍历每个 dl 的直接子节点，把 dt 与紧随其后的 dd 配对；dt/dd 被
+        其他元素包裹、不是 dl 的直接子节点时，改为按文档顺序递归查找。
+        缺少 dd 的 dt 或没有 dt 的 dd 计入 parse_errors，不会让后续条目错位。
+        设置了 seen 或 exclude 时先从 dt 取出 ID，已见或已排除的条目不再解析 dd。
+        """
         papers = []
+        errors = self.parse_errors
+        seen = self.seen
+        failed_before = sum(errors.values())
         
-        # 查找论文条目 - 使用dl结构
-        dl_elements = soup.find_all('dl')
-        for dl in dl_elements:
-            # 查找dt和dd对
-            dt_elements = dl.find_all('dt')
-            dd_elements = dl.find_all('dd')
-            
-            for dt, dd in zip(dt_elements, dd_elements):
-                try:
-                    paper_info = self._extract_paper_info(dt, dd)
-                    if paper_info:
-                        papers.append(paper_info)
-                except Exception as e:
-                    logger.warning(f"解析论文信息失败: {e}")
-                    continue
+        for dl in soup.find_all('dl'):
+            dt = None
+            nodes = [node for node in dl.children if node.name in ('dt', 'dd')] \
+                or dl.find_all(('dt', 'dd'))
+            for node in nodes:
+                name = node.name
+                if name == 'dt':
+                    if dt is not None:
+                        errors['dt_without_dd'] += 1
+                    dt = node
+                elif name == 'dd':
+                    if dt is None:
+                        errors['dd_without_dt'] += 1
+                        continue
+                    arxiv_id = None
+                    if seen is not None or exclude:
+                        arxiv_id = self._extract_arxiv_id(dt)
+                        if arxiv_id and exclude and arxiv_id in exclude:
+                            self.skipped_listed += 1
+                            dt = None
+                            continue
+                        if arxiv_id and seen is not None and arxiv_id in seen:
+                            self.skipped_seen += 1
+                            dt = None
+                            continue
+                    paper = self._extract_paper_info(dt, node, arxiv_id)
+                    if paper is not None:
+                        papers.append(paper)
+                    dt = None
+            if dt is not None:
+                errors['dt_without_dd'] += 1
         
+        # 每页最多输出一条汇总日志，而不是每个失败条目一条
+        failed = sum(errors.values()) - failed_before
+        if failed:
+            logger.warning(f"本页有 {failed} 个条目解析失败，累计: {dict(errors)}")
         return papers
     
-    def _extract_paper_info(self, dt, dd) -> Optional[Dict]:
-        """从dt和dd元素提取论文信息"""
+    def _extract_arxiv_id(self, dt) -> str:
+        """从dt元素提取arXiv ID，摘要链接通常是 dt 的直接子节点"""
+        for node in dt.children:
+            if node.name == 'a' and '/abs/' in node.get('href', ''):
+                arxiv_link = node
+                break
+        else:
+            arxiv_link = dt.find('a', href=_ABS_HREF)
+        return arxiv_link.get_text().strip().replace('arXiv:', '') if arxiv_link else ""
+    
+    def _extract_paper_info(self, dt, dd, arxiv_id: Optional[str] = None) -> Optional[Paper]:
+        """从dt和dd元素提取论文信息，失败时计入 parse_errors 并返回 None"""
         try:
-            # 从dt元素提取arXiv ID和PDF链接
-            arxiv_id = ""
-            pdf_url = ""
-            
-            # 查找arXiv ID链接
-            arxiv_link = dt.find('a', href=re.compile(r'/abs/'))
-            if arxiv_link:
-                arxiv_id = arxiv_link.get_text().strip().replace('arXiv:', '')
-                pdf_url = f"{self.base_url}/pdf/{arxiv_id}.pdf"
-            
+            if arxiv_id is None:
+                arxiv_id = self._extract_arxiv_id(dt)
             if not arxiv_id:
+                self.parse_errors['missing_id'] += 1
                 return None
             
-            # 从dd元素提取论文详细信息
-            meta_div = dd.find('div', class_='meta')
-            if not meta_div:
+            meta_div = None
+            for node in dd.children:
+                if node.name == 'div' and 'meta' in node.get('class', ()):
+                    meta_div = node
+                    break
+            else:
+                meta_div = dd.find('div', class_='meta')
+            if meta_div is None:
+                self.parse_errors['missing_meta'] += 1
                 return None
             
-            # 提取标题
-            title_elem = meta_div.find('div', class_='list-title')
-            if not title_elem:
+            # 一次遍历 meta 的直接子节点，按 class 分派
+            title_elem = authors_elem = abstract_elem = date_elem = None
+            for node in meta_div.children:
+                name = node.name
+                if name == 'div':
+                    classes = node.get('class', ())
+                    if 'list-title' in classes:
+                        title_elem = node
+                    elif 'list-authors' in classes:
+                        authors_elem = node
+                    elif 'list-dateline' in classes:
+                        date_elem = node
+                elif name == 'p' and abstract_elem is None and 'mathjax' in node.get('class', ()):
+                    abstract_elem = node
+            
+            # 页面结构多了包裹元素时，缺少的字段退回递归查找
+            if title_elem is None:
+                title_elem = meta_div.find('div', class_='list-title')
+            if authors_elem is None:
+                authors_elem = meta_div.find('div', class_='list-authors')
+            if abstract_elem is None:
+                abstract_elem = meta_div.find('p', class_='mathjax')
+            if date_elem is None:
+                date_elem = meta_div.find('div', class_='list-dateline')
+            
+            if title_elem is None:
+                self.parse_errors['missing_title'] += 1
                 return None
-                
-            title = title_elem.get_text().replace('Title:', '').strip()
-            # 清理标题中的换行符和多余空格
-            title = ' '.join(title.split())
-            
-            # 提取作者
-            authors_elem = meta_div.find('div', class_='list-authors')
-            authors = []
-            if authors_elem:
-                author_links = authors_elem.find_all('a')
-                authors = [link.get_text().strip() for link in author_links]
-            
-            # 提取摘要
-            abstract_elem = meta_div.find('p', class_='mathjax')
-            abstract = ""
-            if abstract_elem:
-                abstract = abstract_elem.get_text().strip()
-                # 清理摘要中的换行符和多余空格
-                abstract = ' '.join(abstract.split())
-            
-            # 提取提交日期
-            date_elem = meta_div.find('div', class_='list-dateline')
+            
+            # 清理标题、摘要中的换行符和多余空格
+            title = ' '.join(title_elem.get_text().replace('Title:', '').split())
+            authors = [link.get_text().strip() for link in authors_elem.find_all('a')] if authors_elem else []
+            abstract = ' '.join(abstract_elem.get_text().split()) if abstract_elem else ""
+            
             date = ""
-            if date_elem:
+            if date_elem is not None:
                 date = date_elem.get_text().strip()
-                # 提取日期部分
-                date_match = re.search(r'(\d{4}-\d{2}-\d{2})', date)
+                date_match = _DATE_PATTERN.search(date)
                 if date_match:
-                    date = date_match.group(1)
-            
-            return {
-                'arxiv_id': arxiv_id,
-                'title': title,
-                'authors': authors,
-                'abstract': abstract,
-                'date': date,
-                'pdf_url': pdf_url
-            }
+                    date = date_match.group()
+            
+            return Paper(
+                arxiv_id=arxiv_id,
+                title=title,
+                authors=authors,
+                abstract=abstract,
+                date=date,
+                pdf_url=f"{self.base_url}/pdf/{arxiv_id}.pdf"
+            )
             
-        except Exception as e:
-            logger.warning(f"提取论文信息时出错: {e}")
+        except Exception:
+            self.parse_errors['exception'] += 1
             return None
     
-    def extract_keywords(self, papers: List[Dict], top_n: int = 20) -> List[tuple]:
+    def extract_keywords(self, papers: Union[Sequence[Paper], PaperBatch],
+                         top_n: int = 20) -> List[tuple]:
         """
         从论文标题和摘要中提取关键词
         
         Args:
-            papers: 论文列表
+            papers: 论文列表或 PaperBatch
             top_n: 返回前N个关键词
             
         Returns:
@@ -208,31 +339,12 @@ class ArxivCrawler:
         """
         logger.info("开始提取关键词...")
         
-        # 合并所有文本
-        all_text = ""
-        for paper in papers:
-            all_text += paper['title'] + " " + paper['abstract'] + " "
-        
         # 简单的关键词提取（可以后续改进为更复杂的NLP方法）
-        # 移除常见停用词
-        stop_words = {
-            'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for', 
-            'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
-            'before', 'after', 'above', 'below', 'between', 'among', 'is', 'are',
-            'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does',
-            'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
-            'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
-            'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their'
-        }
-        
-        # 提取单词（简单分词）
-        words = re.findall(r'\b[a-zA-Z]{3,}\b', all_text.lower())
-        
-        # 过滤停用词和短词
-        filtered_words = [word for word in words if word not in stop_words and len(word) > 2]
-        
-        # 统计词频
-        word_counts = Counter(filtered_words)
+        # 分词规则和停用词见 keywords.py
+        if isinstance(papers, PaperBatch):
+            word_counts = papers.keyword_counts()
+        else:
+            word_counts = count_keywords(paper['title'] + " " + paper['abstract'] for paper in papers)
         
         # 返回前N个关键词
         top_keywords = word_counts.most_common(top_n)
@@ -240,7 +352,7 @@ class ArxivCrawler:
         logger.info(f"提取到 {len(top_keywords)} 个关键词")
         return top_keywords
     
-    def download_paper(self, paper: Dict, download_dir: str = "papers") -> bool:
+    def download_paper(self, paper: Union[Paper, Dict], download_dir: str = "papers") -> bool:
         """
         下载单篇论文的PDF
         
@@ -251,8 +363,11 @@ class ArxivCrawler:
         Returns:
             是否下载成功
         """
-        if not paper.get('pdf_link'):
+        downloads = self.progress.stage('downloads', unit='paper')
+        pdf_url = paper.get('pdf_url') or paper.get('pdf_link')
+        if not pdf_url:
             logger.warning(f"论文 {paper['title']} 没有PDF链接")
+            downloads.advance(failed=True)
             return False
             
         # 创建下载目录
@@ -266,24 +381,38 @@ class ArxivCrawler:
         # 如果文件已存在，跳过下载
         if os.path.exists(filepath):
             logger.info(f"文件已存在，跳过: {filename}")
+            if self.downloaded is not None:
+                self.downloaded.add(paper['arxiv_id'])
+            downloads.advance()
             return True
             
+        partial = filepath + '.part'
         try:
             logger.info(f"正在下载: {paper['title']}")
-            response = self.session.get(paper['pdf_link'], timeout=60)
-            response.raise_for_status()
-            
-            with open(filepath, 'wb') as f:
-                f.write(response.content)
+            # 分块写入临时文件，实时计入字节数；中途失败不会留下不完整的 PDF
+            with downloads.active():
+                with self.session.get(pdf_url, timeout=60, stream=True) as response:
+                    response.raise_for_status()
+                    with open(partial, 'wb') as f:
+                        for chunk in response.iter_content(chunk_size=64 * 1024):
+                            f.write(chunk)
+                            downloads.add_bytes(len(chunk))
+            os.replace(partial, filepath)
+            if self.downloaded is not None:
+                self.downloaded.add(paper['arxiv_id'])
+            downloads.advance()
                 
             logger.info(f"下载完成: {filename}")
             return True
             
         except Exception as e:
             logger.error(f"下载失败 {paper['title']}: {e}")
+            downloads.advance(failed=True)
+            if os.path.exists(partial):
+                os.remove(partial)
             return False
     
-    def download_papers(self, papers: List[Dict], download_dir: str = "papers", 
+    def download_papers(self, papers: Sequence[Paper], download_dir: str = "papers", 
                        max_downloads: Optional[int] = None) -> int:
         """
         批量下载论文
@@ -296,28 +425,34 @@ class ArxivCrawler:
         Returns:
             成功下载的数量
         """
+        if self.downloaded is not None:
+            pending = [paper for paper in papers if paper['arxiv_id'] not in self.downloaded]
+            if len(pending) < len(papers):
+                logger.info(f"跳过已下载的论文 {len(papers) - len(pending)} 篇")
+            papers = pending
         if max_downloads:
             papers = papers[:max_downloads]
             
         logger.info(f"开始下载 {len(papers)} 篇论文到目录: {download_dir}")
         
+        downloads = self.progress.stage('downloads', unit='paper')
+        downloads.add_total(len(papers))
         success_count = 0
-        for i, paper in enumerate(papers, 1):
-            logger.info(f"进度: {i}/{len(papers)}")
+        for paper in papers:
             if self.download_paper(paper, download_dir):
                 success_count += 1
-            time.sleep(self.delay)  # 避免请求过于频繁
+            self._throttle(downloads)
             
         logger.info(f"下载完成，成功: {success_count}/{len(papers)}")
         return success_count
     
-    def save_papers_info(self, papers: List[Dict], filename: str = "papers_info.json"):
+    def save_papers_info(self, papers: Sequence[Paper], filename: str = "papers_info.json"):
         """保存论文信息到JSON文件"""
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(papers, f, ensure_ascii=False, indent=2)
+            json.dump(papers, f, ensure_ascii=False, indent=2, default=paper_to_json)
         logger.info(f"论文信息已保存到: {filename}")
     
-    def generate_wordcloud(self, papers: List[Dict], output_file: str = "wordcloud.png", 
+    def generate_wordcloud(self, papers: Sequence[Paper], output_file: str = "wordcloud.png", 
                           max_words: int = 100, width: int = 800, height: int = 400) -> bool:
         """
         生成词云图片
@@ -405,9 +540,15 @@ class ArxivCrawler:
 
 
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'backfill':
+        # 历史回填子命令: python arxiv_crawler.py backfill {plan,work,merge,status,run} ...
+        import backfill
+        backfill.main(sys.argv[2:])
+        return
+
     parser = argparse.ArgumentParser(description='arXiv 论文爬取和下载工具')
-    parser.add_argument('--category', '-c', nargs='+', default=['cs.AI'], 
-                       help='栏目代码，支持多个栏目 (默认: cs.AI)')
+    parser.add_argument('--category', '-c', nargs='+',
+                       help='栏目代码，支持多个栏目 (默认: cs.AI；重放时默认为录制中的全部栏目)')
     parser.add_argument('--max-papers', '-n', type=int, default=50,
                        help='最大论文数量 (默认: 50)')
     parser.add_argument('--download', '-d', action='store_true',
@@ -432,18 +573,97 @@ def main():
                        help='词云图片宽度 (默认: 800)')
     parser.add_argument('--wordcloud-height', type=int, default=400,
                        help='词云图片高度 (默认: 400)')
+    parser.add_argument('--keyword-report',
+                       help='跨栏目关键词对比报告文件 (JSON)，同时与上一次运行比较')
+    parser.add_argument('--author-index',
+                       help='作者索引文件 (.npz)，每次运行增量加入新论文并输出高产作者')
+    parser.add_argument('--top-authors', type=int, default=10,
+                       help='输出的高产作者数量 (默认: 10)')
+    parser.add_argument('--watch', action='store_true',
+                       help='守护模式：常驻运行，按时间表轮询栏目，只处理新论文')
+    parser.add_argument('--poll-interval', type=float, default=0,
+                       help='守护模式轮询间隔/秒，0 表示在 arXiv 每日发布后轮询 (默认: 0)')
+    parser.add_argument('--store', default='papers_store.jsonl',
+                       help='守护模式的论文存储文件 (默认: papers_store.jsonl)')
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                       help='按阶段剖析: cpu (cProfile), mem (tracemalloc), both')
+    parser.add_argument('--profile-dir', default='profiles',
+                       help='剖析报告输出目录 (默认: profiles)')
+    parser.add_argument('--profile-sample-rate', type=float, default=1.0,
+                       help='剖析抽样比例，0~1，例如 0.05 表示约 5%% 的运行被剖析 (默认: 1.0)')
+    parser.add_argument('--seen-dir',
+                       help='已见 ID 目录：启用后只处理之前没有见过的论文，并跳过已下载的论文')
+    parser.add_argument('--capture-dir',
+                       help='把列表页原始响应录制到该目录 (*.warc.gz)，供离线重放')
+    parser.add_argument('--replay', nargs='+', metavar='PATH',
+                       help='离线重放录制的列表页（capture 文件或目录），不访问网络')
+    parser.add_argument('--replay-workers', type=int,
+                       help='重放时的解析进程数 (默认: CPU 核数)')
+    parser.add_argument('--progress', choices=PROGRESS_MODES, default='auto',
+                       help='进度显示: bar (进度条), json (定期输出 JSON 行), off; '
+                            'auto 在终端中显示进度条，否则不输出 (默认: auto)')
+    parser.add_argument('--progress-interval', type=float, default=10.0,
+                       help='JSON 进度的输出间隔/秒 (默认: 10)')
     
     args = parser.parse_args()
     
     # 创建爬虫实例
-    crawler = ArxivCrawler(delay=args.delay)
+    profiler = StageProfiler.sampled(args.profile, args.profile_sample_rate,
+                                     output_dir=args.profile_dir)
+    seen = downloaded = None
+    if args.seen_dir:
+        seen = SeenIdSet(os.path.join(args.seen_dir, 'listed'))
+        downloaded = SeenIdSet(os.path.join(args.seen_dir, 'downloaded'))
+    capture = CaptureWriter(args.capture_dir) if args.capture_dir else None
+    progress = ProgressReporter(args.progress, interval=args.progress_interval)
+    # 下载模式只跳过已下载的论文：之前运行中只列出、没有下载的论文需要重新列出才能下载
+    listing_seen = downloaded if args.download and not args.watch else seen
+    crawler = ArxivCrawler(delay=args.delay, profiler=profiler, seen=listing_seen,
+                           downloaded=downloaded, capture=capture, progress=progress)
+    if args.replay:
+        with profiler.stage('parsing'):
+            replayed = replay(args.replay, workers=args.replay_workers, categories=args.category)
+        args.category = list(replayed)
+    elif not args.category:
+        args.category = ['cs.AI']
+    
+    if args.watch:
+        watcher = CrawlWatcher(
+            crawler,
+            categories=args.category,
+            store=PaperStore(args.store),
+            max_papers=args.max_papers,
+            poll_interval=args.poll_interval,
+            download=args.download,
+            download_dir=args.download_dir,
+            author_index=AuthorIndex.open(args.author_index) if args.author_index else None,
+            author_index_path=args.author_index
+        )
+        watcher.install_signal_handlers()
+        try:
+            watcher.run()
+        finally:
+            crawler.log_parse_errors()
+            profiler.dump()
+            progress.close()
+            if capture is not None:
+                capture.close()
+            if seen is not None:
+                seen.close()
+                downloaded.close()
+        return
     
     try:
         all_papers = []
         all_results = {}
         
+        if args.replay:
+            all_results = replayed
+            for papers in replayed.values():
+                all_papers.extend(papers)
+        
         # 处理多栏目
-        if len(args.category) == 1:
+        elif len(args.category) == 1:
             # 单栏目模式
             category = args.category[0]
             logger.info(f"开始爬取栏目 {category} 的论文，目标数量: {args.max_papers}")
@@ -468,15 +688,20 @@ def main():
                 papers_per_category = 1
                 
             logger.info(f"开始爬取 {len(args.category)} 个栏目的论文，每栏目目标数量: {papers_per_category}")
+            listed = set()
             
             for i, category in enumerate(args.category, 1):
                 logger.info(f"[{i}/{len(args.category)}] 正在爬取栏目: {category}")
                 
+                # 交叉列入多个栏目的论文只处理一次；本次运行的 ID 只记在内存里，
+                # 全部处理完成后才写入 seen，不会让后续栏目误判为整页已见而停止翻页
                 papers = crawler.get_papers_from_category(
                     category=category,
                     max_papers=papers_per_category,
-                    start_page=args.start_page
+                    start_page=args.start_page,
+                    exclude=listed if seen is not None else None
                 )
+                listed.update(paper.arxiv_id for paper in papers)
                 
                 if papers:
                     all_papers.extend(papers)
@@ -510,41 +735,81 @@ def main():
             }
             
             with open('multi_category_papers.json', 'w', encoding='utf-8') as f:
-                json.dump(multi_result, f, ensure_ascii=False, indent=2)
+                json.dump(multi_result, f, ensure_ascii=False, indent=2, default=paper_to_json)
             logger.info("多栏目论文信息已保存到: multi_category_papers.json")
         
         # 提取关键词
-        keywords = crawler.extract_keywords(all_papers, top_n=args.keywords)
+        with profiler.stage('keywords'):
+            keywords = crawler.extract_keywords(all_papers, top_n=args.keywords)
         print("\n=== 关键词统计 ===")
         for word, count in keywords:
             print(f"{word}: {count}")
         
+        # 跨栏目、跨运行的关键词对比
+        if args.keyword_report:
+            with profiler.stage('keywords'):
+                report = write_keyword_report(all_results, args.keyword_report, top_n=args.keywords)
+            for category, entry in report['categories'].items():
+                distinctive = ', '.join(item['term'] for item in entry.get('distinctive', [])[:10])
+                rising = ', '.join(item['term'] for item in entry.get('rising', [])[:10])
+                print(f"\n=== {category} ===")
+                if distinctive:
+                    print(f"特征词: {distinctive}")
+                if rising:
+                    print(f"上升词: {rising}")
+        
+        # 更新作者索引
+        if args.author_index:
+            author_index = AuthorIndex.open(args.author_index)
+            author_index.add_papers(all_papers)
+            author_index.save(args.author_index)
+            for category in all_results:
+                print(f"\n=== {category} 高产作者 ===")
+                for name, count in author_index.top_authors(category=category, k=args.top_authors):
+                    print(f"{name}: {count}")
+        
         # 生成词云
         if args.wordcloud:
-            if crawler.generate_wordcloud(
-                all_papers, 
-                output_file=args.wordcloud_file,
-                max_words=args.max_words,
-                width=args.wordcloud_width,
-                height=args.wordcloud_height
-            ):
+            with profiler.stage('wordcloud'):
+                generated = crawler.generate_wordcloud(
+                    all_papers, 
+                    output_file=args.wordcloud_file,
+                    max_words=args.max_words,
+                    width=args.wordcloud_width,
+                    height=args.wordcloud_height
+                )
+            if generated:
                 print(f"\n✅ 词云已生成: {args.wordcloud_file}")
             else:
                 print("\n❌ 词云生成失败")
         
         # 下载论文
         if args.download:
-            success_count = crawler.download_papers(
-                all_papers, 
-                download_dir=args.download_dir,
-                max_downloads=args.max_downloads
-            )
+            with profiler.stage('downloads'):
+                success_count = crawler.download_papers(
+                    all_papers, 
+                    download_dir=args.download_dir,
+                    max_downloads=args.max_downloads
+                )
             print(f"\n下载完成: {success_count} 篇论文")
+        
+        # 全部输出完成后才标记为已见，中途失败或中断的论文下次运行会重新处理
+        if seen is not None and not args.replay:
+            seen.update(paper.arxiv_id for paper in all_papers)
             
     except KeyboardInterrupt:
         logger.info("用户中断操作")
     except Exception as e:
         logger.error(f"程序执行出错: {e}")
+    finally:
+        crawler.log_parse_errors()
+        profiler.dump()
+        progress.close()
+        if capture is not None:
+            capture.close()
+        if seen is not None:
+            seen.close()
+            downloaded.close()
 
 
 if __name__ == "__main__":
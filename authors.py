@@ -0,0 +1,324 @@
+"""
+作者索引与合作者图
+
+把作者名规范化后映射为整数 ID，维护 作者→论文 倒排索引和稀疏的合作者图。
+两者都以排序后的 int64 键（高 32 位为行，低 32 位为列）存储，可直接得到
+CSR 的 indptr / indices。每次爬取新增的边先放入缓冲区，查询前排序成一个
+有序段；相邻的有序段大小相近时两两归并，段的大小按几何级数递减，每条边
+只被复制 O(log n) 次，而不是每批都复制整个数组。查询逐段进行，只有需要
+完整 CSR 或保存时才把全部段归并为一个。
+"""
+
+import logging
+import os
+import re
+import unicodedata
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+import numpy as np
+
+from keywords import tokenize
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+_LOW_MASK = np.int64(0xFFFFFFFF)
+_NON_WORD = re.compile(r'[^\w\s-]')
+
+# 作者数超过该值的论文（大型合作项目）不展开合作者对，避免 O(n^2) 的边数
+MAX_COAUTHORS = 50
+
+
+def normalize_author(name: str) -> str:
+    """规范化作者名：去掉重音符号和标点、统一大小写和空白"""
+    name = unicodedata.normalize('NFKD', name)
+    name = ''.join(ch for ch in name if not unicodedata.combining(ch))
+    name = _NON_WORD.sub(' ', name.casefold())
+    return ' '.join(name.split())
+
+
+def _pack(rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    return (rows.astype(np.int64) << 32) | cols.astype(np.int64)
+
+
+# 一个有序段：(键, 权重)，段内键唯一且升序
+Run = Tuple[np.ndarray, np.ndarray]
+
+
+def _combine(keys: np.ndarray, weights: np.ndarray) -> Run:
+    """合并已排序键数组中的重复键，累加权重"""
+    if len(keys) == 0:
+        return keys, weights
+    starts = np.flatnonzero(np.concatenate(([True], keys[1:] != keys[:-1])))
+    return keys[starts], np.add.reduceat(weights, starts).astype(weights.dtype)
+
+
+def _merge_runs(older: Run, newer: Run) -> Run:
+    """归并两个有序段；两段拼接后的稳定排序（timsort）是线性的归并"""
+    keys = np.concatenate((older[0], newer[0]))
+    weights = np.concatenate((older[1], newer[1]))
+    order = np.argsort(keys, kind='stable')
+    return _combine(keys[order], weights[order])
+
+
+def _add_run(runs: List[Run], new_keys: np.ndarray):
+    """把一批新键排序后作为新段加入，并归并大小相近的相邻段"""
+    new_keys = np.sort(new_keys)
+    runs.append(_combine(new_keys, np.ones(len(new_keys), dtype=np.int32)))
+    while len(runs) > 1 and len(runs[-2][0]) <= 2 * len(runs[-1][0]):
+        newer = runs.pop()
+        runs.append(_merge_runs(runs.pop(), newer))
+
+
+def _compact(runs: List[Run]) -> Run:
+    """把全部段归并为一个"""
+    while len(runs) > 1:
+        newer = runs.pop()
+        runs.append(_merge_runs(runs.pop(), newer))
+    if not runs:
+        runs.append((np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int32)))
+    return runs[0]
+
+
+def _row_slice(keys: np.ndarray, row: int) -> slice:
+    """有序键数组中某一行的范围"""
+    lo, hi = np.searchsorted(keys, [np.int64(row) << 32, np.int64(row + 1) << 32])
+    return slice(lo, hi)
+
+
+class AuthorIndex:
+    def __init__(self, max_coauthors: int = MAX_COAUTHORS):
+        """
+        初始化作者索引
+
+        Args:
+            max_coauthors: 参与构建合作者图的单篇论文最大作者数
+        """
+        self.max_coauthors = max_coauthors
+
+        self.author_ids: Dict[str, int] = {}
+        self.author_names: List[str] = []
+        self.paper_ids: Dict[str, int] = {}
+        self.arxiv_ids: List[str] = []
+        self.category_ids: Dict[str, int] = {}
+        self.category_names: List[str] = []
+        self.paper_categories = array('i')
+        self.term_postings: Dict[str, array] = {}
+
+        # 作者→论文（权重恒为 1）与 合作者图，各自是按从旧到新排列的有序段
+        self._paper_runs: List[Run] = []
+        self._coauthor_runs: List[Run] = []
+
+        self._pending_edges = array('q')
+        self._pending_pairs = array('q')
+
+    def __len__(self):
+        return len(self.arxiv_ids)
+
+    @property
+    def num_authors(self) -> int:
+        return len(self.author_names)
+
+    def _author_id(self, name: str) -> int:
+        key = normalize_author(name)
+        author_id = self.author_ids.get(key)
+        if author_id is None:
+            author_id = self.author_ids[key] = len(self.author_names)
+            self.author_names.append(name)
+        return author_id
+
+    def _category_id(self, category: Optional[str]) -> int:
+        category = category or ""
+        category_id = self.category_ids.get(category)
+        if category_id is None:
+            category_id = self.category_ids[category] = len(self.category_names)
+            self.category_names.append(category)
+        return category_id
+
+    def add_papers(self, papers: Iterable[Union[Paper, Dict]]) -> int:
+        """
+        增量加入一批论文，已索引过的 arXiv ID 会被跳过
+
+        Returns:
+            新加入的论文数量
+        """
+        added = 0
+        for paper in papers:
+            if not isinstance(paper, Paper):
+                paper = Paper.from_dict(paper)
+            if paper.arxiv_id in self.paper_ids:
+                continue
+
+            paper_id = self.paper_ids[paper.arxiv_id] = len(self.arxiv_ids)
+            self.arxiv_ids.append(paper.arxiv_id)
+            self.paper_categories.append(self._category_id(paper.category))
+
+            author_ids = sorted({self._author_id(name) for name in paper.authors})
+            for author_id in author_ids:
+                self._pending_edges.append((author_id << 32) | paper_id)
+            if len(author_ids) <= self.max_coauthors:
+                for i, a in enumerate(author_ids):
+                    for b in author_ids[i + 1:]:
+                        self._pending_pairs.append((a << 32) | b)
+                        self._pending_pairs.append((b << 32) | a)
+
+            for term in set(tokenize(paper.title + " " + paper.abstract)):
+                postings = self.term_postings.get(term)
+                if postings is None:
+                    postings = self.term_postings[term] = array('i')
+                postings.append(paper_id)
+            added += 1
+
+        logger.info(f"作者索引新增 {added} 篇论文，共 {len(self)} 篇论文、{self.num_authors} 位作者")
+        return added
+
+    def _flush(self):
+        """把缓冲区中的新边作为新的有序段加入"""
+        if self._pending_edges:
+            _add_run(self._paper_runs, np.frombuffer(self._pending_edges, dtype=np.int64))
+            self._pending_edges = array('q')
+        if self._pending_pairs:
+            _add_run(self._coauthor_runs, np.frombuffer(self._pending_pairs, dtype=np.int64))
+            self._pending_pairs = array('q')
+
+    def _csr(self, keys: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        rows = keys >> 32
+        indptr = np.searchsorted(rows, np.arange(self.num_authors + 1, dtype=np.int64))
+        indices = (keys & _LOW_MASK).astype(np.int32)
+        return indptr, indices
+
+    def author_papers_csr(self) -> Tuple[np.ndarray, np.ndarray]:
+        """作者→论文倒排索引的 CSR 数组 (indptr, indices)，会把全部段归并为一个"""
+        self._flush()
+        return self._csr(_compact(self._paper_runs)[0])
+
+    def coauthor_csr(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """合作者图的 CSR 数组 (indptr, indices, data)，data 为合作论文数；会把全部段归并为一个"""
+        self._flush()
+        keys, weights = _compact(self._coauthor_runs)
+        indptr, indices = self._csr(keys)
+        return indptr, indices, weights
+
+    def author_papers(self, name: str) -> List[str]:
+        """返回某位作者的全部论文 arXiv ID"""
+        author_id = self.author_ids.get(normalize_author(name))
+        if author_id is None:
+            return []
+        self._flush()
+        # 段按从旧到新排列，论文 ID 随加入顺序递增，按段拼接即为升序
+        paper_ids = [keys[_row_slice(keys, author_id)] & _LOW_MASK for keys, _ in self._paper_runs]
+        return [self.arxiv_ids[i] for i in np.concatenate(paper_ids or [np.empty(0, dtype=np.int64)])]
+
+    def _top(self, counts: np.ndarray, k: int) -> List[Tuple[str, int]]:
+        k = min(k, np.count_nonzero(counts))
+        if k <= 0:
+            return []
+        top = np.argpartition(-counts, k - 1)[:k]
+        top = top[np.lexsort((top, -counts[top]))]
+        return [(self.author_names[i], int(counts[i])) for i in top]
+
+    def top_authors(self, category: Optional[str] = None, keyword: Optional[str] = None,
+                    k: int = 10) -> List[Tuple[str, int]]:
+        """
+        按论文数排序的作者
+
+        Args:
+            category: 只统计该栏目的论文
+            keyword: 只统计标题或摘要中包含该关键词的论文
+            k: 返回数量
+
+        Returns:
+            (作者名, 论文数) 列表
+        """
+        self._flush()
+        paper_mask = np.ones(len(self), dtype=bool)
+        if category is not None:
+            category_id = self.category_ids.get(category)
+            if category_id is None:
+                return []
+            paper_mask &= np.frombuffer(self.paper_categories, dtype=np.int32) == category_id
+        if keyword is not None:
+            postings = self.term_postings.get(keyword.lower())
+            if postings is None:
+                return []
+            keyword_mask = np.zeros(len(self), dtype=bool)
+            keyword_mask[np.frombuffer(postings, dtype=np.int32)] = True
+            paper_mask &= keyword_mask
+
+        counts = np.zeros(self.num_authors, dtype=np.int64)
+        for keys, _ in self._paper_runs:
+            selected = paper_mask[keys & _LOW_MASK]
+            counts += np.bincount(keys[selected] >> 32, minlength=self.num_authors)
+        return self._top(counts, k)
+
+    def collaborators(self, name: str, k: int = 10) -> List[Tuple[str, int]]:
+        """返回某位作者合作最多的 k 位合作者及合作论文数"""
+        author_id = self.author_ids.get(normalize_author(name))
+        if author_id is None:
+            return []
+        self._flush()
+        counts = np.zeros(self.num_authors, dtype=np.int64)
+        for keys, weights in self._coauthor_runs:
+            row = _row_slice(keys, author_id)
+            # 段内键唯一，同一合作者在一个段中只出现一次
+            counts[keys[row] & _LOW_MASK] += weights[row]
+        return self._top(counts, k)
+
+    def save(self, path: str):
+        """保存索引到 .npz 文件"""
+        self._flush()
+        paper_keys = _compact(self._paper_runs)[0]
+        coauthor_keys, coauthor_weights = _compact(self._coauthor_runs)
+        terms = list(self.term_postings)
+        term_offsets = np.cumsum([0] + [len(self.term_postings[t]) for t in terms])
+        postings = np.concatenate(
+            [np.frombuffer(self.term_postings[t], dtype=np.int32) for t in terms]
+        ) if terms else np.empty(0, dtype=np.int32)
+
+        with open(path, 'wb') as f:
+            np.savez_compressed(
+                f,
+                max_coauthors=np.int64(self.max_coauthors),
+                author_keys=np.array(list(self.author_ids), dtype=str),
+                author_names=np.array(self.author_names, dtype=str),
+                arxiv_ids=np.array(self.arxiv_ids, dtype=str),
+                category_names=np.array(self.category_names, dtype=str),
+                paper_categories=np.frombuffer(self.paper_categories, dtype=np.int32),
+                paper_keys=paper_keys,
+                coauthor_keys=coauthor_keys,
+                coauthor_weights=coauthor_weights,
+                terms=np.array(terms, dtype=str),
+                term_offsets=term_offsets.astype(np.int64),
+                postings=postings
+            )
+        logger.info(f"作者索引已保存到: {path}")
+
+    @classmethod
+    def load(cls, path: str) -> 'AuthorIndex':
+        """从 .npz 文件加载索引"""
+        data = np.load(path)
+        index = cls(max_coauthors=int(data['max_coauthors']))
+        index.author_names = data['author_names'].tolist()
+        index.author_ids = {key: i for i, key in enumerate(data['author_keys'].tolist())}
+        index.arxiv_ids = data['arxiv_ids'].tolist()
+        index.paper_ids = {arxiv_id: i for i, arxiv_id in enumerate(index.arxiv_ids)}
+        index.category_names = data['category_names'].tolist()
+        index.category_ids = {name: i for i, name in enumerate(index.category_names)}
+        index.paper_categories = array('i', data['paper_categories'].tobytes())
+        paper_keys = data['paper_keys']
+        index._paper_runs = [(paper_keys, np.ones(len(paper_keys), dtype=np.int32))]
+        index._coauthor_runs = [(data['coauthor_keys'], data['coauthor_weights'])]
+
+        offsets = data['term_offsets']
+        postings = data['postings']
+        for i, term in enumerate(data['terms'].tolist()):
+            index.term_postings[term] = array('i', postings[offsets[i]:offsets[i + 1]].tobytes())
+        return index
+
+    @classmethod
+    def open(cls, path: str) -> 'AuthorIndex':
+        """文件存在时加载，否则返回空索引"""
+        if os.path.exists(path):
+            return cls.load(path)
+        return cls()
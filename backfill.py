@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+多进程分片的历史回填
+
+把大规模回填按 (栏目, 月份, 偏移区间) 切成分片，放进 SQLite 工作队列。
+任意数量的进程（也可以是多台共享同一数据库文件的机器）以租约方式领取分片，
+各自写出部分结果；租约过期的分片会被其他进程重新领取，失败的分片延迟后重试。
+分片结果先写到带领取者标识的临时文件，只有仍持有租约的进程在标记完成时才会
+把它改名为正式文件，租约被接管的进程不会覆盖新领取者的结果。
+最后由 merge 按 arXiv ID 去重合并论文，并由去重后的论文重新统计各栏目的关键词。
+
+不指定 --months 时分片是 recent 列表的偏移区间，列表在回填期间可能前移，
+分片之间会出现重复或遗漏；重复由 merge 去除，需要完整回填时请按月份分片。
+
+队列使用 SQLite 回滚日志（journal_mode=DELETE）而不是 WAL：WAL 依赖单机共享内存，
+不能用于网络文件系统。多台机器共享队列时，文件系统必须正确支持 POSIX 文件锁（如 NFSv4）；
+不满足时请只在一台机器上运行 work。
+
+用法:
+    python backfill.py plan  --queue backfill.db -c cs.AI cs.CV --months 2024-01 2024-06
+    python backfill.py work  --queue backfill.db --workers 2
+    python backfill.py merge --queue backfill.db
+    python backfill.py run   --queue backfill.db -c cs.AI --months 2024-01 2024-03
+"""
+
+import argparse
+import json
+import logging
+import os
+import socket
+import sqlite3
+import time
+import uuid
+from collections import Counter, defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from keywords import count_keywords
+from paper import Paper
+from store import PaperStore
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+ITEMS_PER_PAGE = 50
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS shards (
+    id INTEGER PRIMARY KEY,
+    category TEXT NOT NULL,
+    period TEXT NOT NULL,
+    start INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    status TEXT NOT NULL DEFAULT 'pending',
+    owner TEXT,
+    lease_until REAL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    papers INTEGER,
+    error TEXT,
+    UNIQUE (category, period, start)
+)
+"""
+
+
+def month_range(first: str, last: str) -> List[str]:
+    """返回 first 到 last（含）之间的所有 'YYYY-MM'"""
+    year, month = map(int, first.split('-'))
+    end_year, end_month = map(int, last.split('-'))
+    months = []
+    while (year, month) <= (end_year, end_month):
+        months.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return months
+
+
+class WorkQueue:
+    def __init__(self, path: str, max_attempts: int = 3, retry_delay: float = 60):
+        """
+        基于 SQLite 的分片工作队列
+
+        Args:
+            path: 数据库文件路径，多台机器可共享同一文件（需要文件系统支持文件锁）
+            max_attempts: 单个分片最多尝试次数，超过后标记为 failed
+            retry_delay: 失败分片重新可领取前的等待秒数，按尝试次数线性增加
+        """
+        self.path = path
+        self.max_attempts = max_attempts
+        self.retry_delay = retry_delay
+        self.conn = sqlite3.connect(path, timeout=60, isolation_level=None)
+        # WAL 依赖单机共享内存，队列放在网络文件系统上时不安全，使用回滚日志
+        self.conn.execute('PRAGMA journal_mode=DELETE')
+        self.conn.execute(_SCHEMA)
+
+    def add_shards(self, shards: List[Tuple[str, str, int, int]]) -> int:
+        """加入分片 (栏目, 月份, 起始偏移, 数量)，已存在的分片会被忽略"""
+        before = self.conn.total_changes
+        self.conn.execute('BEGIN IMMEDIATE')
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO shards (category, period, start, count) VALUES (?, ?, ?, ?)',
+            shards)
+        self.conn.execute('COMMIT')
+        return self.conn.total_changes - before
+
+    def claim(self, owner: str, lease_seconds: float) -> Optional[Tuple]:
+        """领取一个待处理或租约已过期的分片"""
+        now = time.time()
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            # 尝试次数已用尽、租约又过期的分片不再重试
+            self.conn.execute(
+                "UPDATE shards SET status = 'failed', error = COALESCE(error, 'lease expired') "
+                "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                (now, self.max_attempts))
+            row = self.conn.execute(
+                "SELECT id, category, period, start, count FROM shards "
+                "WHERE status IN ('pending', 'leased') AND (lease_until IS NULL OR lease_until < ?) "
+                "AND attempts < ? ORDER BY id LIMIT 1",
+                (now, self.max_attempts)).fetchone()
+            if row is not None:
+                self.conn.execute(
+                    "UPDATE shards SET status = 'leased', owner = ?, lease_until = ?, "
+                    "attempts = attempts + 1 WHERE id = ?",
+                    (owner, now + lease_seconds, row[0]))
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return row
+
+    def complete(self, shard_id: int, owner: str, papers: int,
+                 files: Sequence[Tuple[str, str]] = ()) -> bool:
+        """
+        标记完成，并在同一事务中把结果文件从临时路径改名为正式路径
+
+        Args:
+            files: (临时路径, 正式路径) 列表，只有仍持有租约时才会改名
+
+        Returns:
+            是否完成；租约已被他人接管时返回 False，文件保持不动
+        """
+        self.conn.execute('BEGIN IMMEDIATE')
+        try:
+            cursor = self.conn.execute(
+                "UPDATE shards SET status = 'done', papers = ?, lease_until = NULL, error = NULL "
+                "WHERE id = ? AND owner = ? AND status = 'leased'",
+                (papers, shard_id, owner))
+            owned = cursor.rowcount == 1
+            if owned:
+                # 持有写锁期间改名，其他进程无法同时完成同一分片
+                for tmp, path in files:
+                    os.replace(tmp, path)
+            self.conn.execute('COMMIT')
+        except Exception:
+            self.conn.execute('ROLLBACK')
+            raise
+        return owned
+
+    def fail(self, shard_id: int, owner: str, error: str):
+        """释放分片，等待 retry_delay × 尝试次数后重试；尝试次数用尽时标记为 failed"""
+        self.conn.execute(
+            "UPDATE shards SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+            "error = ?, lease_until = ? + ? * attempts WHERE id = ? AND owner = ?",
+            (self.max_attempts, error, time.time(), self.retry_delay, shard_id, owner))
+
+    def next_retry(self) -> Optional[float]:
+        """等待重试的分片中最早可领取的时间，没有时返回 None"""
+        row = self.conn.execute(
+            "SELECT MIN(lease_until) FROM shards WHERE status = 'pending' AND lease_until IS NOT NULL "
+            "AND attempts < ?", (self.max_attempts,)).fetchone()
+        return row[0]
+
+    def status(self) -> Dict[str, int]:
+        rows = self.conn.execute('SELECT status, COUNT(*) FROM shards GROUP BY status').fetchall()
+        return dict(rows)
+
+    def done_shards(self) -> List[int]:
+        return [row[0] for row in self.conn.execute(
+            "SELECT id FROM shards WHERE status = 'done' ORDER BY id")]
+
+
+def plan(queue: WorkQueue, categories: List[str], periods: List[str],
+         per_period: int, shard_size: int) -> int:
+    """
+    为每个 (栏目, 月份) 生成偏移分片
+
+    Args:
+        per_period: 每个月最多回填的论文数
+        shard_size: 每个分片的论文数，会向上取整到每页 50 篇的整数倍
+    """
+    shard_size = max(ITEMS_PER_PAGE, -(-shard_size // ITEMS_PER_PAGE) * ITEMS_PER_PAGE)
+    shards = [
+        (category, period, start, min(shard_size, per_period - start))
+        for category in categories
+        for period in periods
+        for start in range(0, per_period, shard_size)
+    ]
+    if 'recent' in periods and per_period > shard_size:
+        logger.warning("recent 列表在回填期间会前移，按偏移分片可能重复或遗漏论文；"
+                       "需要完整回填时请用 --months 按月份分片")
+    added = queue.add_shards(shards)
+    logger.info(f"新增 {added} 个分片（共规划 {len(shards)} 个）")
+    return added
+
+
+def _shard_path(output_dir: str, shard_id: int) -> str:
+    return os.path.join(output_dir, f"shard_{shard_id:06d}.jsonl")
+
+
+def run_worker(queue_path: str, output_dir: str, delay: float = 1.0,
+               lease_seconds: float = 600, base_url: str = "https://arxiv.org",
+               retry_delay: float = 60) -> int:
+    """
+    循环领取并处理分片，直到队列中没有可领取或等待重试的分片
+
+    Returns:
+        本进程完成的分片数
+    """
+    from arxiv_crawler import ArxivCrawler
+
+    os.makedirs(output_dir, exist_ok=True)
+    token = uuid.uuid4().hex[:8]
+    owner = f"{socket.gethostname()}:{os.getpid()}:{token}"
+    queue = WorkQueue(queue_path, retry_delay=retry_delay)
+    crawler = ArxivCrawler(base_url=base_url, delay=delay)
+    completed = 0
+
+    while True:
+        shard = queue.claim(owner, lease_seconds)
+        if shard is None:
+            retry_at = queue.next_retry()
+            if retry_at is None:
+                break
+            time.sleep(max(retry_at - time.time(), 0) + 0.1)
+            continue
+        shard_id, category, period, start, count = shard
+        try:
+            # 请求失败时抛出异常，由下面的 fail 安排重试，不把不完整的结果标记为完成
+            papers = crawler.get_papers_from_category(
+                category, max_papers=count, start_page=start // ITEMS_PER_PAGE, period=period,
+                raise_errors=True)
+            for paper in papers:
+                paper.category = category
+
+            # 写到本进程专用的临时文件，complete 确认仍持有租约后才改名为正式文件
+            path = _shard_path(output_dir, shard_id)
+            tmp = f"{path}.{token}.tmp"
+            with open(tmp, 'w', encoding='utf-8') as f:
+                f.writelines(json.dumps(p.to_dict(), ensure_ascii=False) + '\n' for p in papers)
+
+            if queue.complete(shard_id, owner, len(papers), files=[(tmp, path)]):
+                completed += 1
+                logger.info(f"分片 {shard_id} ({category} {period} +{start}) 完成: {len(papers)} 篇")
+            else:
+                os.remove(tmp)
+                logger.warning(f"分片 {shard_id} 的租约已被其他进程接管，丢弃本进程的结果")
+        except Exception as e:
+            logger.error(f"分片 {shard_id} 处理失败: {e}")
+            queue.fail(shard_id, owner, str(e))
+
+    return completed
+
+
+def run_workers(queue_path: str, output_dir: str, workers: int, delay: float = 1.0,
+                **kwargs) -> int:
+    """
+    在本机启动多个工作进程
+
+    delay 是本机所有进程合计的请求间隔：每个进程按 delay × workers 等待，
+    增加进程数只提高解析吞吐，不会提高对 arxiv.org 的请求速率。
+    """
+    kwargs['delay'] = delay * max(workers, 1)
+    if workers <= 1:
+        return run_worker(queue_path, output_dir, **kwargs)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(run_worker, queue_path, output_dir, **kwargs) for _ in range(workers)]
+        return sum(future.result() for future in futures)
+
+
+def merge(queue: WorkQueue, output_dir: str, papers_file: str, keywords_file: str,
+          top_n: int = 50) -> Tuple[int, Dict]:
+    """
+    合并已完成分片的结果
+
+    论文按 arXiv ID 去重（保留分片编号最小的一份）。关键词由去重后的论文统计：
+    每个栏目中同一篇论文只计一次，交叉列入多个栏目的论文计入每个栏目，
+    但在 total 中只计一次，因此 total 与合并后的论文文件一致。
+
+    Returns:
+        (去重后的论文数, 关键词汇总)
+    """
+    seen = set()
+    seen_in_category: Dict[str, set] = defaultdict(set)
+    merged: List[Paper] = []
+    keywords: Dict[str, Counter] = defaultdict(Counter)
+    total = Counter()
+
+    for shard_id in queue.done_shards():
+        papers_path = _shard_path(output_dir, shard_id)
+        if not os.path.exists(papers_path):
+            logger.warning(f"分片 {shard_id} 缺少输出文件，跳过")
+            continue
+
+        for paper in PaperStore(papers_path):
+            category_ids = seen_in_category[paper.category]
+            if paper.arxiv_id in category_ids:
+                continue
+            category_ids.add(paper.arxiv_id)
+            counts = count_keywords((paper.title + " " + paper.abstract,))
+            keywords[paper.category].update(counts)
+            if paper.arxiv_id not in seen:
+                seen.add(paper.arxiv_id)
+                merged.append(paper)
+                total.update(counts)
+
+    if os.path.exists(papers_file):
+        os.remove(papers_file)
+    PaperStore(papers_file).append(merged)
+
+    summary = {
+        'categories': {category: counts.most_common(top_n) for category, counts in keywords.items()},
+        'total': total.most_common(top_n)
+    }
+    with open(keywords_file, 'w', encoding='utf-8') as f:
+        json.dump(summary, f, ensure_ascii=False, indent=2)
+    logger.info(f"合并完成: {len(merged)} 篇论文 -> {papers_file}，关键词 -> {keywords_file}")
+    return len(merged), summary
+
+
+def main(argv: Optional[List[str]] = None):
+    parser = argparse.ArgumentParser(description='arXiv 多进程分片历史回填')
+    parser.add_argument('command', choices=['plan', 'work', 'merge', 'status', 'run'],
+                       help='plan: 规划分片; work: 处理分片; merge: 合并结果; '
+                            'status: 查看进度; run: 规划+处理+合并')
+    parser.add_argument('--queue', default='backfill.db',
+                       help='SQLite 工作队列文件 (默认: backfill.db)')
+    parser.add_argument('--output-dir', default='backfill_shards',
+                       help='分片结果目录 (默认: backfill_shards)')
+    parser.add_argument('--category', '-c', nargs='+', default=['cs.AI'],
+                       help='栏目代码，支持多个栏目 (默认: cs.AI)')
+    parser.add_argument('--months', nargs=2, metavar=('FIRST', 'LAST'),
+                       help='回填的月份区间，如 2024-01 2024-06；不指定时回填 recent 列表')
+    parser.add_argument('--per-month', type=int, default=2000,
+                       help='每个栏目每月最多回填的论文数 (默认: 2000)')
+    parser.add_argument('--shard-size', type=int, default=500,
+                       help='每个分片的论文数 (默认: 500)')
+    parser.add_argument('--workers', type=int, default=2,
+                       help='本机工作进程数 (默认: 2)')
+    parser.add_argument('--delay', type=float, default=1.0,
+                       help='本机所有进程合计的请求间隔时间/秒 (默认: 1.0)')
+    parser.add_argument('--retry-delay', type=float, default=60,
+                       help='失败分片的重试等待/秒，按尝试次数递增 (默认: 60)')
+    parser.add_argument('--lease', type=float, default=600,
+                       help='分片租约时长/秒，超时未完成的分片会被重新领取 (默认: 600)')
+    parser.add_argument('--papers-file', default='backfill_papers.jsonl',
+                       help='合并后的论文文件 (默认: backfill_papers.jsonl)')
+    parser.add_argument('--keywords-file', default='backfill_keywords.json',
+                       help='合并后的关键词文件 (默认: backfill_keywords.json)')
+    args = parser.parse_args(argv)
+
+    queue = WorkQueue(args.queue)
+    if args.command in ('plan', 'run'):
+        periods = month_range(*args.months) if args.months else ['recent']
+        plan(queue, args.category, periods, args.per_month, args.shard_size)
+    if args.command in ('work', 'run'):
+        completed = run_workers(args.queue, args.output_dir, args.workers,
+                                delay=args.delay, lease_seconds=args.lease,
+                                retry_delay=args.retry_delay)
+        logger.info(f"本机共完成 {completed} 个分片")
+    if args.command in ('merge', 'run'):
+        merge(queue, args.output_dir, args.papers_file, args.keywords_file)
+    print(json.dumps(queue.status(), ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
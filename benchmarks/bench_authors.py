@@ -0,0 +1,125 @@
+"""作者索引构建与查询基准"""
+
+import random
+from collections import Counter
+
+import pytest
+
+from authors import AuthorIndex, normalize_author
+from keywords import tokenize
+from paper import Paper
+
+
+@pytest.fixture(scope='module')
+def synthetic_papers():
+    rng = random.Random(0)
+    names = [f"Author {i}" for i in range(20000)]
+    return [
+        Paper(f"2410.{i:05d}", "title", [rng.choice(names) for _ in range(rng.randint(1, 8))],
+              "graph neural network", category=rng.choice(['cs.AI', 'cs.LG', 'cs.CV']))
+        for i in range(50000)
+    ]
+
+
+@pytest.mark.benchmark(group='authors')
+def test_incremental_build(benchmark, synthetic_papers):
+    """分 50 批增量加入，每批之后都查询一次"""
+    def build():
+        index = AuthorIndex()
+        for start in range(0, len(synthetic_papers), 1000):
+            index.add_papers(synthetic_papers[start:start + 1000])
+            index.collaborators('Author 0')
+        return index
+
+    index = benchmark.pedantic(build, rounds=3)
+    assert len(index) == len(synthetic_papers)
+
+
+@pytest.mark.benchmark(group='authors')
+def test_top_authors_by_category(benchmark, synthetic_papers):
+    index = AuthorIndex()
+    index.add_papers(synthetic_papers)
+    top = benchmark(index.top_authors, category='cs.CV', k=20)
+    assert len(top) == 20
+
+
+@pytest.fixture(scope='module')
+def small_papers():
+    """作者和词表都较小，合作关系与关键词有大量重复"""
+    rng = random.Random(1)
+    names = [f"Author {i}" for i in range(60)] + ["José Núñez", "JOSE NUNEZ"]
+    words = ['graph', 'neural', 'network', 'diffusion', 'transformer', 'quantum']
+    return [
+        Paper(f"2410.{i:05d}", rng.choice(words), rng.sample(names, rng.randint(1, 6)),
+              ' '.join(rng.sample(words, 2)), category=rng.choice(['cs.AI', 'cs.LG', 'cs.CV']))
+        for i in range(3000)
+    ]
+
+
+def _brute_force(papers):
+    """逐篇统计作者论文数与合作次数，作为对照"""
+    papers_by_author = {}
+    collaborations = {}
+    for paper in papers:
+        authors = sorted({normalize_author(name) for name in paper.authors})
+        for author in authors:
+            papers_by_author.setdefault(author, []).append(paper)
+            for other in authors:
+                if other != author:
+                    collaborations.setdefault(author, Counter())[other] += 1
+    return papers_by_author, collaborations
+
+
+def _check_index(index, papers):
+    papers_by_author, collaborations = _brute_force(papers)
+    keys = {normalize_author(name): name for name in index.author_names}
+    for author, expected in collaborations.items():
+        result = index.collaborators(keys[author], k=index.num_authors)
+        assert {normalize_author(name): count for name, count in result} == expected
+        assert [count for _, count in result] == sorted(expected.values(), reverse=True)
+    for author, expected in papers_by_author.items():
+        assert index.author_papers(keys[author]) == [paper.arxiv_id for paper in expected]
+
+    for category, keyword in [(None, None), ('cs.CV', None), (None, 'diffusion'), ('cs.AI', 'graph')]:
+        expected = Counter()
+        for author, author_papers in papers_by_author.items():
+            for paper in author_papers:
+                if category is not None and paper.category != category:
+                    continue
+                if keyword is not None and keyword not in tokenize(paper.title + " " + paper.abstract):
+                    continue
+                expected[author] += 1
+        result = index.top_authors(category=category, keyword=keyword, k=index.num_authors)
+        assert {normalize_author(name): count for name, count in result} == +expected
+
+
+def test_queries_match_brute_force(small_papers):
+    """分批加入后的查询结果与逐篇统计一致，重复加入的论文被跳过"""
+    index = AuthorIndex()
+    for start in range(0, len(small_papers), 250):
+        index.add_papers(small_papers[start:start + 250])
+        index.collaborators('Author 0')
+    assert index.add_papers(small_papers[:100]) == 0
+    _check_index(index, small_papers)
+
+    # CSR 视图与逐段查询一致
+    indptr, indices, data = index.coauthor_csr()
+    author_id = index.author_ids['author 0']
+    assert sum(data[indptr[author_id]:indptr[author_id + 1]]) == \
+        sum(count for _, count in index.collaborators('Author 0', k=index.num_authors))
+
+
+def test_save_load_round_trip(small_papers, tmp_path):
+    """保存后加载的索引查询结果不变，并且可以继续增量加入"""
+    path = str(tmp_path / 'authors.npz')
+    half = len(small_papers) // 2
+    index = AuthorIndex()
+    index.add_papers(small_papers[:half])
+    index.save(path)
+
+    loaded = AuthorIndex.load(path)
+    assert loaded.author_names == index.author_names
+    _check_index(loaded, small_papers[:half])
+
+    loaded.add_papers(small_papers[half:])
+    _check_index(loaded, small_papers)
@@ -0,0 +1,80 @@
+"""分片回填的吞吐与合并基准（使用本地 HTTP 替身）"""
+
+import pytest
+
+import backfill
+from keywords import count_keywords
+from store import PaperStore
+from stub_server import StubArxivServer
+
+
+@pytest.mark.benchmark(group='backfill')
+@pytest.mark.parametrize('workers', [1, 4])
+def test_backfill_workers(benchmark, tmp_path, workers):
+    rounds = iter(range(100))
+
+    def setup():
+        # 每轮使用新的队列和输出目录
+        directory = tmp_path / str(next(rounds))
+        directory.mkdir()
+        queue_path = str(directory / 'queue.db')
+        backfill.plan(backfill.WorkQueue(queue_path), ['cs.AI', 'cs.CV'],
+                      ['2024-01', '2024-02'], 200, 50)
+        return (queue_path, str(directory / 'shards'), workers), {}
+
+    with StubArxivServer(total_papers=200, latency=0.02) as server:
+        completed = benchmark.pedantic(
+            lambda *args: backfill.run_workers(*args, delay=0, base_url=server.base_url),
+            setup=setup, rounds=3)
+    assert completed == 16
+
+
+def test_merge_deduplicates(tmp_path):
+    """同一篇论文出现在多个分片中时只保留一份，关键词由去重后的论文统计"""
+    queue_path = str(tmp_path / 'queue.db')
+    queue = backfill.WorkQueue(queue_path)
+    backfill.plan(queue, ['cs.AI', 'cs.CV'], ['recent'], 100, 50)
+    with StubArxivServer(total_papers=100) as server:
+        backfill.run_worker(queue_path, str(tmp_path / 'shards'), delay=0, base_url=server.base_url)
+
+    count, summary = backfill.merge(queue, str(tmp_path / 'shards'),
+                                    str(tmp_path / 'papers.jsonl'), str(tmp_path / 'keywords.json'))
+    assert count == 100
+    assert queue.status() == {'done': 4}
+    # 替身服务器对每个栏目返回相同的论文，栏目词频与总词频都等于去重后论文的词频
+    papers = list(PaperStore(str(tmp_path / 'papers.jsonl')))
+    expected = count_keywords(p.title + " " + p.abstract for p in papers)
+    for counts in [summary['total']] + list(summary['categories'].values()):
+        assert counts
+        assert all(expected[word] == n for word, n in counts)
+
+
+def test_expired_lease_does_not_overwrite(tmp_path):
+    """租约被接管后，原领取者的结果不会覆盖新领取者已完成的文件"""
+    queue = backfill.WorkQueue(str(tmp_path / 'queue.db'))
+    backfill.plan(queue, ['cs.AI'], ['recent'], 50, 50)
+    shard_id = queue.claim('a', lease_seconds=0)[0]
+    assert queue.claim('b', lease_seconds=600)[0] == shard_id
+
+    path = str(tmp_path / 'shard.jsonl')
+    for owner in ('b', 'a'):
+        with open(f"{path}.{owner}.tmp", 'w') as f:
+            f.write(owner)
+    assert queue.complete(shard_id, 'b', 1, files=[(f"{path}.b.tmp", path)])
+    assert not queue.complete(shard_id, 'a', 1, files=[(f"{path}.a.tmp", path)])
+    with open(path) as f:
+        assert f.read() == 'b'
+
+
+def test_failed_fetch_is_retried(tmp_path):
+    """请求失败的分片不能被标记为完成，而是延迟后重试"""
+    queue_path = str(tmp_path / 'queue.db')
+    queue = backfill.WorkQueue(queue_path)
+    backfill.plan(queue, ['cs.AI'], ['recent'], 200, 100)
+    with StubArxivServer(total_papers=200, error_rate=0.3, seed=3) as server:
+        backfill.run_worker(queue_path, str(tmp_path / 'shards'), delay=0,
+                            base_url=server.base_url, retry_delay=0.1)
+
+    rows = queue.conn.execute('SELECT status, papers, attempts FROM shards ORDER BY id').fetchall()
+    assert all(status == 'done' and papers == 100 for status, papers, _ in rows)
+    assert max(attempts for _, _, attempts in rows) > 1
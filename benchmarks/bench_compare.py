@@ -0,0 +1,71 @@
+"""跨栏目关键词对比基准：30 个栏目、10 万词表"""
+
+import numpy as np
+import pytest
+
+from compare import KeywordComparison, log_likelihood
+from paper import Paper
+
+
+@pytest.fixture(scope='module')
+def large_matrix():
+    rng = np.random.default_rng(0)
+    # Zipf 分布的词频更接近真实语料
+    return rng.zipf(1.5, size=(30, 100000)).astype(np.int64) - 1
+
+
+@pytest.mark.benchmark(group='compare')
+def test_log_likelihood(benchmark, large_matrix):
+    g2 = benchmark(log_likelihood, large_matrix)
+    assert g2.shape == large_matrix.shape
+
+
+@pytest.mark.benchmark(group='compare')
+def test_comparison_report(benchmark, papers):
+    groups = {f"cat{i}": papers[i::30] for i in range(30)}
+    report = benchmark(lambda: KeywordComparison(groups).report(top_n=20))
+    assert len(report['categories']) == 30
+
+
+def _run(state, groups):
+    comparison = KeywordComparison({category: [Paper(arxiv_id=str(i), title=title)
+                                               for i, title in enumerate(titles)]
+                                    for category, titles in groups.items()})
+    comparison.align_previous(state)
+    report = comparison.report()
+    comparison.save_state(state)
+    data = np.load(state)
+    saved = {category: {term for term, count in zip(data['terms'].tolist(), row) if count}
+             for category, row in zip(data['categories'].tolist(), data['matrix'])}
+    return report, saved, set(data['terms'].tolist())
+
+
+def test_state_drops_vanished_terms(tmp_path):
+    """状态只保存本次出现的词；消失的词在下一次运行中报告为下降后不再保留"""
+    state = str(tmp_path / 'state.npz')
+    _, _, terms = _run(state, {'cs.AI': ['quantum annealing']})
+    assert terms == {'quantum', 'annealing'}
+
+    report, _, terms = _run(state, {'cs.AI': ['diffusion sampling']})
+    assert terms == {'diffusion', 'sampling'}
+    falling = {item['term'] for item in report['categories']['cs.AI']['falling']}
+    assert falling == {'quantum', 'annealing'}
+
+    _, _, terms = _run(state, {'cs.AI': ['diffusion transformer']})
+    assert terms == {'diffusion', 'transformer'}
+
+
+def test_state_keeps_categories_not_crawled(tmp_path):
+    """本次没有爬取的栏目保留上次的词频，下次爬取时仍与之比较"""
+    state = str(tmp_path / 'state.npz')
+    _run(state, {'cs.AI': ['quantum annealing'], 'cs.CV': ['image segmentation']})
+
+    report, saved, _ = _run(state, {'cs.AI': ['diffusion sampling']})
+    assert list(report['categories']) == ['cs.AI']
+    assert saved == {'cs.AI': {'diffusion', 'sampling'}, 'cs.CV': {'image', 'segmentation'}}
+
+    report, saved, _ = _run(state, {'cs.CV': ['image detection']})
+    entry = report['categories']['cs.CV']
+    assert {item['term'] for item in entry['rising']} == {'detection'}
+    assert {item['term'] for item in entry['falling']} == {'segmentation'}
+    assert saved == {'cs.CV': {'image', 'detection'}, 'cs.AI': {'diffusion', 'sampling'}}
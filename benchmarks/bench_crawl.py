@@ -0,0 +1,67 @@
+"""端到端爬取与下载吞吐基准（使用本地 HTTP 替身）"""
+
+import itertools
+import random
+
+import pytest
+
+from arxiv_crawler import ArxivCrawler
+from fixtures import make_papers
+from stub_server import ITEMS_PER_PAGE, StubArxivServer
+
+TOTAL_PAPERS = 200
+
+
+@pytest.mark.benchmark(group='crawl')
+@pytest.mark.parametrize('latency', [0.0, 0.02])
+def test_get_papers_from_category(benchmark, latency):
+    with StubArxivServer(total_papers=TOTAL_PAPERS, latency=latency) as server:
+        crawler = ArxivCrawler(base_url=server.base_url, delay=0)
+        papers = benchmark.pedantic(crawler.get_papers_from_category,
+                                    args=('cs.AI',), kwargs={'max_papers': TOTAL_PAPERS},
+                                    rounds=5)
+    assert len(papers) == TOTAL_PAPERS
+    benchmark.extra_info['pages'] = -(-TOTAL_PAPERS // ITEMS_PER_PAGE)
+
+
+@pytest.mark.benchmark(group='crawl')
+def test_get_papers_with_errors(benchmark):
+    """服务端间歇性返回 503 时，爬取在第一次失败处结束并返回已获取的部分"""
+    error_rate, seed = 0.3, 2
+    # 按替身的随机序列算出第一次失败之前成功的页数
+    rng = random.Random(seed)
+    pages = 0
+    while pages * ITEMS_PER_PAGE < TOTAL_PAPERS and rng.random() >= error_rate:
+        pages += 1
+    assert 0 < pages * ITEMS_PER_PAGE < TOTAL_PAPERS
+
+    with StubArxivServer(total_papers=TOTAL_PAPERS, error_rate=error_rate, seed=seed) as server:
+        crawler = ArxivCrawler(base_url=server.base_url, delay=0)
+
+        def setup():
+            # 每轮重置错误注入，使失败出现在同一页
+            server.reseed()
+            return ('cs.AI',), {'max_papers': TOTAL_PAPERS}
+
+        papers = benchmark.pedantic(crawler.get_papers_from_category, setup=setup, rounds=5)
+    assert len(papers) == pages * ITEMS_PER_PAGE
+
+
+@pytest.mark.benchmark(group='download')
+@pytest.mark.parametrize('pdf_size', [64 * 1024, 1024 * 1024])
+def test_download_papers(benchmark, tmp_path, pdf_size):
+    count = 20
+    counter = itertools.count()
+    with StubArxivServer(pdf_size=pdf_size) as server:
+        crawler = ArxivCrawler(base_url=server.base_url, delay=0)
+        papers = make_papers(count)
+        for paper in papers:
+            paper.pdf_url = f"{server.base_url}/pdf/{paper.arxiv_id}.pdf"
+
+        def setup():
+            # 每轮使用新目录，避免"文件已存在"直接跳过
+            return (papers,), {'download_dir': str(tmp_path / str(next(counter)))}
+
+        success = benchmark.pedantic(crawler.download_papers, setup=setup, rounds=5)
+    assert success == count
+    benchmark.extra_info['bytes_per_round'] = count * pdf_size
@@ -0,0 +1,30 @@
+"""关键词提取与词云生成基准"""
+
+import pytest
+
+import arxiv_crawler
+from paper import PaperBatch
+
+
+@pytest.mark.benchmark(group='keywords')
+def test_extract_keywords(benchmark, crawler, papers):
+    keywords = benchmark(crawler.extract_keywords, papers, top_n=50)
+    assert len(keywords) == 50
+
+
+@pytest.mark.benchmark(group='wordcloud')
+@pytest.mark.skipif(not arxiv_crawler.WORDCLOUD_AVAILABLE,
+                    reason='需要安装 wordcloud 和 matplotlib')
+def test_generate_wordcloud(benchmark, crawler, papers, tmp_path):
+    output_file = str(tmp_path / 'wordcloud.png')
+    ok = benchmark.pedantic(crawler.generate_wordcloud, args=(papers[:500],),
+                            kwargs={'output_file': output_file}, rounds=3)
+    assert ok
+
+
+@pytest.mark.benchmark(group='keywords')
+def test_extract_keywords_batch(benchmark, crawler, papers):
+    """按列存储的 PaperBatch 路径"""
+    batch = PaperBatch.from_papers(papers)
+    keywords = benchmark(crawler.extract_keywords, batch, top_n=50)
+    assert keywords == crawler.extract_keywords(papers, top_n=50)
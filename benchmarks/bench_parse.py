@@ -0,0 +1,70 @@
+"""列表页解析基准"""
+
+import pytest
+from bs4 import BeautifulSoup
+
+import legacy_parse
+from fixtures import make_listing_html
+
+
+@pytest.fixture(scope='module')
+def large_soup():
+    """arXiv 单页最多显示 2000 篇论文"""
+    return BeautifulSoup(make_listing_html(2000), 'html.parser')
+
+
+@pytest.mark.benchmark(group='parse')
+def test_parse_paper_list(benchmark, crawler, listing_soup):
+    papers = benchmark(crawler._parse_paper_list, listing_soup)
+    assert len(papers) == 500
+
+
+@pytest.mark.benchmark(group='parse')
+def test_soup_and_parse(benchmark, crawler, listing_html):
+    """包含 BeautifulSoup 建树开销的完整解析路径"""
+    def run():
+        return crawler._parse_paper_list(BeautifulSoup(listing_html, 'html.parser'))
+
+    papers = benchmark(run)
+    assert len(papers) == 500
+
+
+@pytest.mark.benchmark(group='parse-large')
+def test_parse_large_page(benchmark, crawler, large_soup):
+    papers = benchmark(crawler._parse_paper_list, large_soup)
+    assert papers == legacy_parse.parse_paper_list(large_soup)
+
+
+@pytest.mark.benchmark(group='parse-large')
+def test_parse_large_page_legacy(benchmark, large_soup):
+    """重写前的实现，作为对照"""
+    papers = benchmark(legacy_parse.parse_paper_list, large_soup)
+    assert len(papers) == 2000
+
+
+def test_malformed_page_stays_aligned(crawler):
+    """缺少 dd 的条目只计入 parse_errors，不影响后续条目的配对"""
+    html = make_listing_html(3)
+    first_dd_end = html.index('</dd>') + len('</dd>')
+    first_dd_start = html.rindex('<dd>', 0, first_dd_end)
+    broken = html[:first_dd_start] + html[first_dd_end:]
+
+    papers = crawler._parse_paper_list(BeautifulSoup(broken, 'html.parser'))
+    expected = crawler._parse_paper_list(BeautifulSoup(html, 'html.parser'))[1:]
+    assert papers == expected
+    assert crawler.parse_errors['dt_without_dd'] == 1
+
+
+def test_wrapped_markup_falls_back(crawler):
+    """dt/dd 和 meta 中的字段多了一层包裹元素时，结果与旧实现一致"""
+    html = make_listing_html(20)
+    wrapped = (html.replace('<dt>', '<div class="item"><dt>').replace('</dd>', '</dd></div>')
+               .replace("<div class='meta'>", "<div class='meta'><div class='wrapper'>")
+               .replace('</p>\n  </div>\n</dd>', '</p>\n  </div></div>\n</dd>'))
+    assert wrapped.count("class='wrapper'") == 20
+
+    soup = BeautifulSoup(wrapped, 'html.parser')
+    papers = crawler._parse_paper_list(soup)
+    assert papers == legacy_parse.parse_paper_list(soup)
+    assert len(papers) == 20 and all(p.authors and p.abstract and p.date for p in papers)
+    assert not crawler.parse_errors
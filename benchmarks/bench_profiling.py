@@ -0,0 +1,68 @@
+"""阶段剖析的开销、嵌套阶段归属与抽样"""
+
+import pstats
+import random
+
+import pytest
+
+from profiling import StageProfiler
+
+BLOCK = 4 * 1024 * 1024
+
+
+def _inner_work():
+    return sum(range(10000))
+
+
+@pytest.mark.benchmark(group='profiling')
+def test_stage_overhead(benchmark, tmp_path):
+    """内存模式下每次进出阶段的开销，不应随堆的大小增长"""
+    heap = [bytearray(1024) for _ in range(20000)]
+    profiler = StageProfiler('mem', output_dir=str(tmp_path))
+
+    def run():
+        for _ in range(100):
+            with profiler.stage('listing'):
+                with profiler.stage('parsing'):
+                    pass
+
+    benchmark(run)
+    profiler.dump()
+    assert len(heap) == 20000
+
+
+def test_nested_stage_attribution(tmp_path):
+    """内层阶段的分配和调用只计入内层，不计入外层"""
+    profiler = StageProfiler('both', output_dir=str(tmp_path))
+    with profiler.stage('outer'):
+        small = bytearray(1024)
+        with profiler.stage('inner'):
+            big = bytearray(BLOCK)
+            _inner_work()
+        temp = bytearray(BLOCK // 4)
+        del temp
+
+    stats = profiler.stats()
+    assert stats['inner']['mem_net'] >= BLOCK
+    assert stats['inner']['mem_peak'] >= BLOCK
+    assert stats['outer']['mem_net'] < BLOCK // 8
+    assert BLOCK // 8 < stats['outer']['mem_peak'] < BLOCK
+
+    functions = {func[2] for func in pstats.Stats(profiler._cpu_profiles['inner']).stats}
+    assert '_inner_work' in functions
+    functions = {func[2] for func in pstats.Stats(profiler._cpu_profiles['outer']).stats}
+    assert '_inner_work' not in functions
+
+    written = profiler.dump()
+    assert any(path.endswith('_mem.txt') for path in written)
+    assert len(small) + len(big) == 1024 + BLOCK
+
+
+def test_sample_rate():
+    random.seed(0)
+    runs = 4000
+    enabled = sum(StageProfiler.sampled('cpu', 0.05).enabled for _ in range(runs))
+    assert 0.03 * runs < enabled < 0.07 * runs
+    assert not any(StageProfiler.sampled('cpu', 0.0).enabled for _ in range(100))
+    assert all(StageProfiler.sampled('cpu', 1.0).enabled for _ in range(100))
+    assert not StageProfiler.sampled(None, 1.0).enabled
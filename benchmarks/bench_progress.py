@@ -0,0 +1,98 @@
+"""进度汇报的开销与 JSON 输出"""
+
+import io
+import json
+import threading
+
+import pytest
+
+import progress
+from progress import ProgressReporter
+
+
+@pytest.mark.benchmark(group='progress')
+def test_concurrent_advance(benchmark):
+    """8 个线程同时更新同一阶段，计数不能丢失"""
+    def run():
+        reporter = ProgressReporter('off')
+        stage = reporter.stage('downloads', unit='paper')
+
+        def work():
+            for _ in range(5000):
+                with stage.active():
+                    stage.add_bytes(1024)
+                stage.advance()
+
+        threads = [threading.Thread(target=work) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return stage.snapshot()
+
+    snapshot = benchmark.pedantic(run, rounds=5)
+    assert snapshot['done'] == 40000
+    assert snapshot['bytes'] == 40000 * 1024
+    assert snapshot['in_flight'] == 0
+
+
+def test_json_lines():
+    stream = io.StringIO()
+    reporter = ProgressReporter('json', interval=3600, stream=stream)
+    listing = reporter.stage('listing', unit='page')
+    listing.add_total(4)
+    listing.advance(nbytes=1000)
+    listing.add_wait(1.0)
+    reporter.close()
+
+    entry = json.loads(stream.getvalue().splitlines()[-1])
+    assert entry['stage'] == 'listing'
+    assert (entry['done'], entry['total'], entry['bytes']) == (1, 4, 1000)
+    assert entry['eta'] is not None and 0 < entry['wait_ratio'] <= 1
+
+
+def test_auto_is_silent_without_tty():
+    """输出不是终端时 auto 与 off 相同，不会改变原有的日志输出"""
+    stream = io.StringIO()
+    reporter = ProgressReporter('auto', interval=0.01, stream=stream)
+    reporter.stage('listing', unit='page').advance()
+    reporter.close()
+    assert reporter.mode == 'off'
+    assert stream.getvalue() == ''
+
+
+def test_snapshot_does_not_skew_window(monkeypatch):
+    """额外调用 snapshot 不影响 JSON 输出的窗口速率；窗口从上一次输出开始计算"""
+    now = [100.0]
+    monkeypatch.setattr(progress.time, 'monotonic', lambda: now[0])
+    stream = io.StringIO()
+    reporter = ProgressReporter('json', interval=3600, stream=stream)
+    stage = reporter.stage('downloads', unit='paper')
+
+    stage.advance(10, nbytes=1000)
+    now[0] += 10
+    reporter._emit()
+    stage.advance(40, nbytes=8000)
+    now[0] += 10
+    stage.snapshot()
+    reporter.snapshot()
+    reporter._emit()
+
+    first, second = (json.loads(line) for line in stream.getvalue().splitlines())
+    assert (first['rate'], first['bytes_per_sec']) == (1.0, 100.0)
+    assert (second['rate'], second['bytes_per_sec']) == (4.0, 800.0)
+    assert second['avg_rate'] == 2.5
+    reporter.close()
+
+
+def test_bar_rate_is_recent(monkeypatch):
+    """进度条的 MB/s 是最近一个窗口的吞吐，而不是整个阶段的平均值"""
+    now = [100.0]
+    monkeypatch.setattr(progress.time, 'monotonic', lambda: now[0])
+    stage = progress.StageProgress('downloads', 'paper')
+    stage.add_bytes(10_000_000)
+    now[0] += 10
+    assert stage._postfix().startswith('1.00MB/s')
+    stage.add_bytes(4_000_000)
+    now[0] += 1
+    assert stage._postfix().startswith('4.00MB/s')
@@ -0,0 +1,60 @@
+"""录制列表页的离线重放基准"""
+
+import glob
+
+import pytest
+
+from capture import CaptureWriter, iter_records, replay
+from fixtures import make_listing_html
+
+PAGES = 20
+PER_PAGE = 50
+
+
+@pytest.fixture(scope='module')
+def capture_dir(tmp_path_factory):
+    """两个栏目各 20 页的录制文件"""
+    directory = tmp_path_factory.mktemp('captures')
+    writer = CaptureWriter(str(directory))
+    for category in ('cs.AI', 'cs.CV'):
+        for page in range(PAGES):
+            body = make_listing_html(PER_PAGE, offset=page * PER_PAGE).encode('utf-8')
+            url = f"https://arxiv.org/list/{category}/recent?skip={page * PER_PAGE}"
+            writer.record(url, 200, {'Content-Type': 'text/html; charset=utf-8'}, body)
+    writer.close()
+    return str(directory)
+
+
+@pytest.mark.benchmark(group='replay')
+@pytest.mark.parametrize('workers', [1, 4])
+def test_replay(benchmark, capture_dir, workers):
+    results = benchmark.pedantic(replay, args=([capture_dir],), kwargs={'workers': workers}, rounds=3)
+    assert {category: len(papers) for category, papers in results.items()} == {
+        'cs.AI': PAGES * PER_PAGE, 'cs.CV': PAGES * PER_PAGE}
+    assert results['cs.CV'][0].category == 'cs.CV'
+
+
+def test_replay_category_filter(capture_dir):
+    results = replay([capture_dir], workers=1, categories=['cs.AI'])
+    assert list(results) == ['cs.AI']
+
+
+@pytest.mark.benchmark(group='replay')
+def test_iter_records(benchmark, capture_dir):
+    """只解压、不解析的顺序读取速度"""
+    path = glob.glob(f"{capture_dir}/*.warc.gz")[0]
+    records = benchmark(lambda: list(iter_records(path)))
+    assert len(records) == 2 * PAGES
+
+
+def test_iter_records_small_chunks(capture_dir, tmp_path):
+    """记录跨越多个读取块时结果不变，末尾不完整的记录被忽略"""
+    path = glob.glob(f"{capture_dir}/*.warc.gz")[0]
+    expected = list(iter_records(path))
+    assert list(iter_records(path, chunk_size=1000)) == expected
+
+    truncated = tmp_path / 'truncated.warc.gz'
+    with open(path, 'rb') as f:
+        data = f.read()
+    truncated.write_bytes(data + data[:500])
+    assert list(iter_records(str(truncated), chunk_size=1000)) == expected
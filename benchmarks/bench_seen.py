@@ -0,0 +1,111 @@
+"""已见 ID 集合的查询与跳过解析基准"""
+
+import functools
+import json
+import sys
+
+import pytest
+
+import arxiv_crawler
+from arxiv_crawler import ArxivCrawler
+from fixtures import make_arxiv_id
+from seen import SeenIdSet
+from stub_server import StubArxivServer
+
+
+@pytest.fixture(scope='module')
+def seen_ids(tmp_path_factory):
+    seen = SeenIdSet(str(tmp_path_factory.mktemp('seen') / 'listed'))
+    seen.update(make_arxiv_id(i) for i in range(100_000))
+    yield seen
+    seen.close()
+
+
+@pytest.mark.benchmark(group='seen')
+def test_lookup_unseen(benchmark, seen_ids):
+    """新 ID 只需检查 Bloom 过滤器"""
+    ids = [f"2501.{i:05d}" for i in range(1000)]
+    hits = benchmark(lambda: sum(arxiv_id in seen_ids for arxiv_id in ids))
+    assert hits == 0
+
+
+@pytest.mark.benchmark(group='seen')
+def test_lookup_seen(benchmark, seen_ids):
+    """已见 ID 需要回查 SQLite 精确表"""
+    ids = [make_arxiv_id(i) for i in range(0, 100_000, 100)]
+    hits = benchmark(lambda: sum(arxiv_id in seen_ids for arxiv_id in ids))
+    assert hits == len(ids)
+
+
+def test_reopen_is_exact(tmp_path):
+    seen = SeenIdSet(str(tmp_path / 'ids'), capacity=1000)
+    assert seen.update(['2410.00001', '2410.00002', '2410.00001']) == 2
+    seen.close()
+
+    reopened = SeenIdSet(str(tmp_path / 'ids'))
+    assert '2410.00001' in reopened and '2410.00003' not in reopened
+    assert len(reopened) == 2
+
+
+@pytest.mark.benchmark(group='parse')
+def test_parse_skips_seen(benchmark, listing_soup, seen_ids):
+    """列表页全部已见时只提取 dt 中的 ID，不再解析 dd"""
+    crawler = ArxivCrawler(delay=0, seen=seen_ids)
+    papers = benchmark(crawler._parse_paper_list, listing_soup)
+    assert papers == []
+    assert crawler.skipped_seen > 0
+
+
+def test_all_seen_stops_paging(tmp_path):
+    """没有新论文时只请求第一页，而不是翻完整个列表"""
+    seen = SeenIdSet(str(tmp_path / 'listed'))
+    seen.update(make_arxiv_id(i) for i in range(1000))
+    with StubArxivServer(total_papers=1000) as server:
+        crawler = ArxivCrawler(base_url=server.base_url, delay=0, seen=seen)
+        papers = crawler.get_papers_from_category('cs.AI', max_papers=50)
+        assert papers == []
+        assert server.request_count == 1
+
+
+def test_excluded_page_keeps_paging(tmp_path):
+    """本次运行中已获取的论文整页出现在后续栏目时继续翻页，而不是停止"""
+    seen = SeenIdSet(str(tmp_path / 'listed'))
+    with StubArxivServer(total_papers=200) as server:
+        crawler = ArxivCrawler(base_url=server.base_url, delay=0, seen=seen)
+        first = crawler.get_papers_from_category('cs.AI', max_papers=50)
+        listed = {paper.arxiv_id for paper in first}
+        # 替身对每个栏目返回相同的列表，cs.CV 第一页全部是 cs.AI 中已获取的论文
+        second = crawler.get_papers_from_category('cs.CV', max_papers=50, exclude=listed)
+    assert len(second) == 50
+    assert not listed & {paper.arxiv_id for paper in second}
+    assert server.request_count == 3
+
+
+def _run_main(monkeypatch, tmp_path, server, *argv):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(arxiv_crawler, 'ArxivCrawler',
+                        functools.partial(ArxivCrawler, base_url=server.base_url))
+    monkeypatch.setattr(sys, 'argv', ['arxiv_crawler.py', '--delay', '0', '--progress', 'off',
+                                      '--seen-dir', 'seen', *argv])
+    arxiv_crawler.main()
+    seen = SeenIdSet(str(tmp_path / 'seen' / 'listed'))
+    try:
+        return len(seen)
+    finally:
+        seen.close()
+
+
+def test_seen_marked_after_outputs(monkeypatch, tmp_path):
+    """论文在输出完成后才记入 listed；中途失败的运行不标记，下次重新处理"""
+    def fail(*args, **kwargs):
+        raise RuntimeError('keywords failed')
+
+    with StubArxivServer(total_papers=200) as server:
+        with monkeypatch.context() as patch:
+            patch.setattr(ArxivCrawler, 'extract_keywords', fail)
+            assert _run_main(patch, tmp_path, server, '-c', 'cs.AI', 'cs.CV', '-n', '100') == 0
+
+        assert _run_main(monkeypatch, tmp_path, server, '-c', 'cs.AI', 'cs.CV', '-n', '100') == 100
+    with open(tmp_path / 'multi_category_papers.json', encoding='utf-8') as f:
+        counts = json.load(f)['papers_per_category']
+    assert counts == {'cs.AI': 50, 'cs.CV': 50}
@@ -0,0 +1,105 @@
+"""语义向量、Top-K 相似检索与聚类基准"""
+
+import random
+
+import numpy as np
+import pytest
+
+from paper import Paper
+from semantic import (EmbeddingStore, HashedTfidfEmbedder, MiniBatchKMeans, build,
+                      label_clusters, paper_text)
+from store import PaperStore
+
+
+@pytest.fixture(scope='module')
+def texts(papers):
+    # 录制的条目只有几种摘要，末尾加上编号词使每篇文档互不相同
+    return [f"{paper_text(p)} topic{i % 97} item{i}" for i, p in enumerate(papers)]
+
+
+@pytest.fixture(scope='module')
+def store(texts, tmp_path_factory):
+    vectors = HashedTfidfEmbedder(dim=64).fit_transform(texts)
+    path = str(tmp_path_factory.mktemp('semantic') / 'embeddings')
+    return EmbeddingStore.create(path, [str(i) for i in range(len(texts))], vectors)
+
+
+@pytest.mark.benchmark(group='semantic')
+def test_fit_transform(benchmark, texts):
+    vectors = benchmark.pedantic(lambda: HashedTfidfEmbedder(dim=64).fit_transform(texts), rounds=3)
+    assert vectors.shape == (len(texts), 64)
+
+
+@pytest.mark.benchmark(group='semantic')
+def test_topk(benchmark, store):
+    queries = np.asarray(store.vectors[:100])
+    scores, rows = benchmark(store.topk, queries, k=10)
+    assert rows.shape == (100, 10)
+    assert np.all(np.diff(scores, axis=1) <= 1e-6)
+
+
+@pytest.mark.benchmark(group='semantic')
+def test_minibatch_kmeans(benchmark, store):
+    kmeans = benchmark.pedantic(lambda: MiniBatchKMeans(n_clusters=10, batch_size=512).fit(store.vectors),
+                                rounds=3)
+    assert kmeans.centers.shape == (10, 64)
+
+
+TOPICS = {
+    'quantum': ['quantum', 'qubit', 'entanglement', 'decoherence', 'annealing', 'photonic'],
+    'vision': ['image', 'segmentation', 'pixel', 'camera', 'detection', 'convolutional'],
+    'language': ['language', 'translation', 'token', 'grammar', 'parsing', 'lexical'],
+    'robotics': ['robot', 'manipulation', 'grasping', 'locomotion', 'actuator', 'gripper'],
+    'graphs': ['graph', 'vertex', 'edge', 'spectral', 'coloring', 'clique'],
+    'crypto': ['encryption', 'cipher', 'signature', 'protocol', 'adversary', 'lattice'],
+    'biology': ['protein', 'genome', 'molecule', 'cell', 'sequencing', 'enzyme'],
+    'audio': ['speech', 'audio', 'acoustic', 'speaker', 'waveform', 'spectrogram'],
+}
+COMMON = ['method', 'results', 'model', 'approach', 'study']
+
+
+def _topic_papers(per_topic, seed, start=0):
+    rng = random.Random(seed)
+    papers, topics = [], []
+    for topic, words in TOPICS.items():
+        for i in range(start, start + per_topic):
+            text = ' '.join(rng.choices(words, k=12) + rng.choices(COMMON, k=4))
+            papers.append(Paper(f"{topic}.{i}", text.split()[0], abstract=text))
+            topics.append(topic)
+    return papers, topics
+
+
+@pytest.mark.parametrize('seed', range(5))
+def test_separable_topics(seed):
+    """用词互不重叠的主题各自成为一个聚类，且聚类关键词来自该主题"""
+    papers, topics = _topic_papers(150, seed)
+    vectors = HashedTfidfEmbedder(dim=32).fit_transform([paper_text(p) for p in papers])
+    kmeans = MiniBatchKMeans(n_clusters=len(TOPICS), batch_size=256, seed=seed).fit(vectors)
+    labels = kmeans.predict(vectors)
+
+    cluster_of = {}
+    for label, topic in zip(labels, topics):
+        assert cluster_of.setdefault(topic, label) == label
+    assert len(set(cluster_of.values())) == len(TOPICS)
+
+    keywords = label_clusters(labels, papers, top_n=3)
+    for topic, cluster in cluster_of.items():
+        assert set(keywords[cluster]) <= set(TOPICS[topic])
+
+
+def test_incremental_build(tmp_path):
+    """再次 build 只为新论文生成向量，沿用保存的投影，结果与整体 transform 一致"""
+    first, _ = _topic_papers(50, 0)
+    second, _ = _topic_papers(10, 1, start=50)
+    corpus = tmp_path / 'papers.jsonl'
+    vectors = str(tmp_path / 'embeddings')
+    PaperStore(str(corpus)).append(first)
+    store = build(str(corpus), vectors, kind='tfidf', dim=16)
+    assert len(store) == len(first)
+
+    PaperStore(str(corpus)).append(second)
+    store = build(str(corpus), vectors, kind='tfidf', dim=16)
+    assert store.ids == [p.arxiv_id for p in first + second]
+    embedder = HashedTfidfEmbedder.load(vectors + '.model.npz')
+    expected = embedder.transform([paper_text(p) for p in second])
+    assert np.allclose(store.vectors[len(first):], expected, atol=1e-5)
@@ -0,0 +1,138 @@
+"""查询服务的处理函数与缓存"""
+
+import asyncio
+import json
+from http import HTTPStatus
+
+import pytest
+
+from authors import normalize_author
+from fixtures import make_papers
+from keywords import tokenize
+from service import QueryService
+from store import PaperStore
+
+CATEGORIES = ('cs.AI', 'cs.CV', 'cs.LG')
+
+
+@pytest.fixture(scope='module')
+def corpus(tmp_path_factory):
+    papers = make_papers(2000)
+    for i, paper in enumerate(papers):
+        paper.category = CATEGORIES[i % len(CATEGORIES)]
+    path = str(tmp_path_factory.mktemp('service') / 'papers.jsonl')
+    PaperStore(path).append(papers)
+    return path, papers
+
+
+@pytest.fixture
+def loop():
+    loop = asyncio.new_event_loop()
+    yield loop
+    loop.close()
+
+
+def _get(loop, service, path, **params):
+    status, _, body = loop.run_until_complete(service.handle(path, params))
+    return status, body
+
+
+def _json_get(loop, service, path, **params):
+    status, body = _get(loop, service, path, **params)
+    assert status == HTTPStatus.OK, body
+    return json.loads(body)
+
+
+def test_search_with_category(loop, corpus):
+    """total 只统计通过栏目筛选的论文"""
+    path, papers = corpus
+    service = QueryService(path)
+    word = tokenize(papers[0].title)[0]
+    matching = [p for p in papers if word in tokenize(p.title + " " + p.abstract)]
+    assert matching
+
+    result = _json_get(loop, service, '/search', q=word, limit='1000')
+    assert result['total'] == len(matching)
+    for category in CATEGORIES:
+        expected = {p.arxiv_id for p in matching if p.category == category}
+        result = _json_get(loop, service, '/search', q=word, category=category, limit='5')
+        assert result['total'] == len(expected)
+        assert {item['arxiv_id'] for item in result['results']} <= expected
+        assert len(result['results']) == min(5, len(expected))
+
+
+def test_search_by_author(loop, corpus):
+    path, papers = corpus
+    service = QueryService(path)
+    name = papers[0].authors[0]
+    expected = {p.arxiv_id for p in papers
+                if normalize_author(name) in {normalize_author(a) for a in p.authors}}
+    result = _json_get(loop, service, '/search', author=name.upper(), limit='5000')
+    assert {item['arxiv_id'] for item in result['results']} == expected
+
+    result = _json_get(loop, service, '/search', author=name, category='cs.CV', limit='5000')
+    assert result['total'] == len({p.arxiv_id for p in papers
+                                   if p.arxiv_id in expected and p.category == 'cs.CV'})
+
+    status, _ = _get(loop, service, '/search')
+    assert status == HTTPStatus.BAD_REQUEST
+
+
+def test_category_listing(loop, corpus):
+    path, papers = corpus
+    service = QueryService(path)
+    assert _json_get(loop, service, '/categories') == {
+        category: sum(p.category == category for p in papers) for category in CATEGORIES}
+
+    result = _json_get(loop, service, '/categories/cs.LG', limit='10', offset='5')
+    assert result['total'] == sum(p.category == 'cs.LG' for p in papers)
+    assert len(result['papers']) == 10
+    assert all(item['category'] == 'cs.LG' for item in result['papers'])
+
+    status, _ = _get(loop, service, '/categories/cs.XX')
+    assert status == HTTPStatus.NOT_FOUND
+
+
+class FakeRenderer:
+    """代替 ArxivCrawler 生成固定大小的"图片"，并记录调用次数"""
+
+    def __init__(self, size):
+        self.size = size
+        self.calls = 0
+
+    def generate_wordcloud(self, papers, output_file, max_words):
+        self.calls += 1
+        with open(output_file, 'wb') as f:
+            f.write(b'\x89PNG' + bytes(self.size))
+        return True
+
+
+def test_wordcloud_cache_is_bounded_by_bytes(loop, corpus):
+    """图片只渲染一次；总字节数超过上限时淘汰最久未用的结果"""
+    path, _ = corpus
+    service = QueryService(path, cache_size=100, cache_bytes=250 * 1024)
+    renderer = service._crawler = FakeRenderer(100 * 1024)
+
+    first = _get(loop, service, '/wordcloud.png', category='cs.AI')
+    assert first[0] == HTTPStatus.OK
+    assert _get(loop, service, '/wordcloud.png', category='cs.AI') == first
+    assert renderer.calls == 1
+
+    _get(loop, service, '/wordcloud.png', category='cs.CV')
+    _get(loop, service, '/wordcloud.png', category='cs.LG')
+    # 三张图超过 250 KiB，最早的 cs.AI 被淘汰
+    assert service._cached_bytes <= service.cache_bytes
+    assert len(service._cache) == 2
+    _get(loop, service, '/wordcloud.png', category='cs.AI')
+    assert renderer.calls == 4
+
+
+@pytest.mark.benchmark(group='service')
+def test_cached_response(benchmark, loop, corpus):
+    """命中缓存的查询只需一次 stat 和一次字典查找"""
+    path, _ = corpus
+    service = QueryService(path)
+    params = {'category': 'cs.CV', 'k': '20'}
+    first = loop.run_until_complete(service.handle('/keywords', params))
+    result = benchmark(lambda: loop.run_until_complete(service.handle('/keywords', params)))
+    assert result is first
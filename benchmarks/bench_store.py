@@ -0,0 +1,40 @@
+"""论文存储的读取基准与截断容错"""
+
+import pytest
+
+from fixtures import make_papers
+from paper import Paper
+from store import PaperStore
+
+
+@pytest.mark.benchmark(group='store')
+def test_load(benchmark, tmp_path, papers):
+    store = PaperStore(str(tmp_path / 'papers.jsonl'))
+    store.append(papers)
+    loaded = benchmark(store.load)
+    assert len(loaded) == len(papers)
+
+
+def test_truncated_last_line(tmp_path):
+    """写入中途中断留下的半行不影响读取，之后的追加也不会与其粘连"""
+    path = tmp_path / 'papers.jsonl'
+    store = PaperStore(str(path))
+    store.append(make_papers(3))
+    with open(path, 'a', encoding='utf-8') as f:
+        f.write('{"arxiv_id": "2410.99999", "tit')
+    assert len(store.load()) == 3
+
+    assert store.append(make_papers(5)[3:]) == 2
+    assert [paper.arxiv_id for paper in store] == [paper.arxiv_id for paper in make_papers(5)]
+
+
+def test_paper_hashable(tmp_path):
+    """Paper 可以放进集合或作为字典键，读回的论文与原论文相等且哈希相同"""
+    papers = make_papers(10)
+    store = PaperStore(str(tmp_path / 'papers.jsonl'))
+    store.append(papers)
+    loaded = store.load()
+    assert set(loaded) == set(papers)
+    assert len(set(papers + loaded)) == len(papers)
+    assert {paper: i for i, paper in enumerate(papers)}[loaded[3]] == 3
+    assert hash(Paper.from_dict(papers[0].to_dict())) == hash(papers[0])
@@ -0,0 +1,137 @@
+"""守护模式的调度顺序、跨轮询去重与停止（使用本地 HTTP 替身）"""
+
+import os
+import signal
+import threading
+import time
+
+import pytest
+
+from arxiv_crawler import ArxivCrawler
+from seen import SeenIdSet
+from store import PaperStore
+from stub_server import StubArxivServer
+from watcher import CrawlWatcher
+
+PAPERS = 20
+
+
+class RecordingWatcher(CrawlWatcher):
+    """记录每个任务的执行顺序，下载可以人为放慢"""
+
+    def __init__(self, *args, download_delay: float = 0, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.download_delay = download_delay
+        self.order = []
+        self.downloads_started = threading.Event()
+
+    def _poll(self, category):
+        self.order.append(('poll', category))
+        super()._poll(category)
+
+    def _process(self, category, papers):
+        self.order.append(('process', category))
+        super()._process(category, papers)
+
+    def _download(self, paper):
+        self.order.append(('download', paper.arxiv_id))
+        self.downloads_started.set()
+        time.sleep(self.download_delay)
+        super()._download(paper)
+
+
+class FlakyStore(PaperStore):
+    """第一次追加失败，模拟写入存储时出错"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.failures = 1
+
+    def append(self, papers):
+        if self.failures:
+            self.failures -= 1
+            raise OSError("磁盘已满")
+        return super().append(papers)
+
+
+@pytest.fixture
+def server():
+    with StubArxivServer(total_papers=PAPERS) as server:
+        yield server
+
+
+def _start(watcher):
+    thread = threading.Thread(target=watcher.run, daemon=True)
+    thread.start()
+    return thread
+
+
+def _wait_for(condition, timeout=10):
+    deadline = time.time() + timeout
+    while not condition():
+        assert time.time() < deadline, "等待超时"
+        time.sleep(0.01)
+
+
+def test_priority_order_and_dedup(server, tmp_path):
+    """先处理已拿到的论文、再下载，最后才轮询下一个栏目；交叉列入的论文只处理一次"""
+    crawler = ArxivCrawler(base_url=server.base_url, delay=0)
+    store = PaperStore(str(tmp_path / 'papers.jsonl'))
+    # 替身对每个栏目返回同一批论文，相当于全部交叉列入
+    watcher = RecordingWatcher(crawler, ['cs.AI', 'cs.CV'], store, max_papers=PAPERS,
+                               poll_interval=3600, download=True,
+                               download_dir=str(tmp_path / 'pdf'))
+    thread = _start(watcher)
+    _wait_for(lambda: watcher.stats['polls'] == 2 and watcher._queue.unfinished_tasks == 0)
+    watcher.stop()
+    thread.join(timeout=10)
+    assert not thread.is_alive()
+
+    downloads = [('download', paper.arxiv_id) for paper in store]
+    assert watcher.order == [('poll', 'cs.AI'), ('process', 'cs.AI')] + downloads + [('poll', 'cs.CV')]
+    assert len(store.load()) == PAPERS
+    assert watcher.stats['papers'] == watcher.stats['downloads'] == PAPERS
+    assert len(os.listdir(tmp_path / 'pdf')) == PAPERS
+
+
+def test_failed_process_is_retried(server, tmp_path):
+    """写入存储失败时论文不计入已见集合，下一次轮询会重新处理"""
+    seen = SeenIdSet(str(tmp_path / 'seen' / 'listed'))
+    crawler = ArxivCrawler(base_url=server.base_url, delay=0, seen=seen)
+    store = FlakyStore(str(tmp_path / 'papers.jsonl'))
+    watcher = RecordingWatcher(crawler, ['cs.AI'], store, max_papers=PAPERS, poll_interval=0.1)
+    thread = _start(watcher)
+    _wait_for(lambda: watcher.stats['papers'] == PAPERS)
+    watcher.stop()
+    thread.join(timeout=10)
+
+    assert watcher.order[:4] == [('poll', 'cs.AI'), ('process', 'cs.AI')] * 2
+    assert len(store.load()) == PAPERS
+    assert all(paper.arxiv_id in seen for paper in store)
+    # 之后的轮询不再产生新论文
+    assert watcher.order.count(('process', 'cs.AI')) == 2
+    seen.close()
+
+
+def test_sigterm_drains_queue(server, tmp_path):
+    """收到 SIGTERM 后不再轮询，但已排队的下载全部完成后才退出"""
+    crawler = ArxivCrawler(base_url=server.base_url, delay=0)
+    store = PaperStore(str(tmp_path / 'papers.jsonl'))
+    watcher = RecordingWatcher(crawler, ['cs.AI', 'cs.CV'], store, max_papers=PAPERS,
+                               poll_interval=3600, download=True,
+                               download_dir=str(tmp_path / 'pdf'), download_delay=0.02)
+    handlers = signal.getsignal(signal.SIGTERM), signal.getsignal(signal.SIGINT)
+    try:
+        watcher.install_signal_handlers()
+        thread = _start(watcher)
+        assert watcher.downloads_started.wait(timeout=10)
+        os.kill(os.getpid(), signal.SIGTERM)
+        thread.join(timeout=10)
+    finally:
+        signal.signal(signal.SIGTERM, handlers[0])
+        signal.signal(signal.SIGINT, handlers[1])
+
+    assert not thread.is_alive()
+    assert watcher.stats['downloads'] == PAPERS
+    # cs.CV 的轮询排在下载之后，停止后被跳过
+    assert ('poll', 'cs.CV') not in watcher.order
@@ -0,0 +1,33 @@
+"""基准测试公共 fixture"""
+
+import logging
+
+import pytest
+from bs4 import BeautifulSoup
+
+from arxiv_crawler import ArxivCrawler
+from fixtures import make_listing_html, make_papers
+
+# 基准测试中屏蔽逐条 INFO 日志，避免测到的是终端输出速度
+logging.disable(logging.INFO)
+
+
+@pytest.fixture(scope='session')
+def listing_html():
+    """包含 500 篇论文的大列表页"""
+    return make_listing_html(500)
+
+
+@pytest.fixture(scope='session')
+def listing_soup(listing_html):
+    return BeautifulSoup(listing_html, 'html.parser')
+
+
+@pytest.fixture(scope='session')
+def papers():
+    return make_papers(2000)
+
+
+@pytest.fixture
+def crawler():
+    return ArxivCrawler(delay=0)
@@ -0,0 +1,83 @@
+"""
+基准测试用的录制数据
+
+data/ 目录下保存了按 arXiv 实际页面结构截取的列表页和 Atom feed，
+这里把其中的条目按需复制成任意规模的页面，并生成虚拟 PDF 内容，
+使基准测试完全离线、可重复。
+"""
+
+import re
+from pathlib import Path
+
+DATA_DIR = Path(__file__).parent / 'data'
+
+_ENTRY_RE = re.compile(r'<dt>.*?</dd>', re.S)
+_ID_RE = re.compile(r'\d{4}\.\d{4,5}')
+
+
+def _load_listing_template():
+    """拆分录制的列表页，返回 (页头, 条目列表, 页尾)"""
+    html = (DATA_DIR / 'list_recent.html').read_text(encoding='utf-8')
+    entries = _ENTRY_RE.findall(html)
+    head = html[:html.index(entries[0])]
+    tail = html[html.rindex(entries[-1]) + len(entries[-1]):]
+    return head, entries, tail
+
+
+_HEAD, _ENTRIES, _TAIL = _load_listing_template()
+
+
+def make_arxiv_id(index: int) -> str:
+    """生成第 index 篇虚拟论文的 arXiv ID"""
+    return f"2410.{index + 1:05d}"
+
+
+def make_listing_html(count: int, offset: int = 0) -> str:
+    """
+    生成包含 count 篇论文的列表页
+
+    Args:
+        count: 页面中的论文数量
+        offset: 第一篇论文的全局序号，用于保证分页之间 ID 不重复
+
+    Returns:
+        列表页 HTML
+    """
+    parts = [_HEAD]
+    for i in range(count):
+        entry = _ENTRIES[(offset + i) % len(_ENTRIES)]
+        parts.append(_ID_RE.sub(make_arxiv_id(offset + i), entry))
+        parts.append('\n')
+    parts.append(_TAIL)
+    return ''.join(parts)
+
+
+def make_atom_feed() -> str:
+    """返回录制的 arXiv API Atom feed"""
+    return (DATA_DIR / 'api_query.atom').read_text(encoding='utf-8')
+
+
+def make_pdf_bytes(size: int) -> bytes:
+    """生成大小为 size 字节的虚拟 PDF 内容"""
+    header = b'%PDF-1.4\n'
+    trailer = b'\n%%EOF\n'
+    padding = max(size - len(header) - len(trailer), 0)
+    return header + b'0' * padding + trailer
+
+
+def make_papers(count: int) -> list:
+    """生成 count 篇论文，内容取自录制的列表页"""
+    from bs4 import BeautifulSoup
+    from arxiv_crawler import ArxivCrawler
+    from paper import Paper
+
+    soup = BeautifulSoup(make_listing_html(len(_ENTRIES)), 'html.parser')
+    templates = ArxivCrawler()._parse_paper_list(soup)
+    papers = []
+    for i in range(count):
+        paper = Paper.from_dict(templates[i % len(templates)].to_dict())
+        paper.arxiv_id = make_arxiv_id(i)
+        paper.pdf_url = f"https://arxiv.org/pdf/{paper.arxiv_id}.pdf"
+        paper.category = 'cs.AI'
+        papers.append(paper)
+    return papers
@@ -0,0 +1,109 @@
+"""
+重写前的列表页解析实现
+
+保留单遍遍历重写之前 _parse_paper_list / _extract_paper_info 的查找逻辑
+（多次递归 find_all/find、按 zip 配对 dt 与 dd），作为 bench_parse.py 中
+微基准的对照组。与原代码相比只做了两处改动：返回 Paper 而不是字典，
+base_url 改为参数传入。
+"""
+
+import logging
+import re
+from typing import List, Optional
+
+from bs4 import BeautifulSoup
+
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+
+def parse_paper_list(soup: BeautifulSoup, base_url: str = "https://arxiv.org") -> List[Paper]:
+    """解析论文列表页面"""
+    papers = []
+
+    # 查找论文条目 - 使用dl结构
+    dl_elements = soup.find_all('dl')
+    for dl in dl_elements:
+        # 查找dt和dd对
+        dt_elements = dl.find_all('dt')
+        dd_elements = dl.find_all('dd')
+
+        for dt, dd in zip(dt_elements, dd_elements):
+            try:
+                paper_info = extract_paper_info(dt, dd, base_url)
+                if paper_info:
+                    papers.append(paper_info)
+            except Exception as e:
+                logger.warning(f"解析论文信息失败: {e}")
+                continue
+
+    return papers
+
+def extract_paper_info(dt, dd, base_url: str) -> Optional[Paper]:
+    """从dt和dd元素提取论文信息"""
+    try:
+        # 从dt元素提取arXiv ID和PDF链接
+        arxiv_id = ""
+        pdf_url = ""
+
+        # 查找arXiv ID链接
+        arxiv_link = dt.find('a', href=re.compile(r'/abs/'))
+        if arxiv_link:
+            arxiv_id = arxiv_link.get_text().strip().replace('arXiv:', '')
+            pdf_url = f"{base_url}/pdf/{arxiv_id}.pdf"
+
+        if not arxiv_id:
+            return None
+
+        # 从dd元素提取论文详细信息
+        meta_div = dd.find('div', class_='meta')
+        if not meta_div:
+            return None
+
+        # 提取标题
+        title_elem = meta_div.find('div', class_='list-title')
+        if not title_elem:
+            return None
+
+        title = title_elem.get_text().replace('Title:', '').strip()
+        # 清理标题中的换行符和多余空格
+        title = ' '.join(title.split())
+
+        # 提取作者
+        authors_elem = meta_div.find('div', class_='list-authors')
+        authors = []
+        if authors_elem:
+            author_links = authors_elem.find_all('a')
+            authors = [link.get_text().strip() for link in author_links]
+
+        # 提取摘要
+        abstract_elem = meta_div.find('p', class_='mathjax')
+        abstract = ""
+        if abstract_elem:
+            abstract = abstract_elem.get_text().strip()
+            # 清理摘要中的换行符和多余空格
+            abstract = ' '.join(abstract.split())
+
+        # 提取提交日期
+        date_elem = meta_div.find('div', class_='list-dateline')
+        date = ""
+        if date_elem:
+            date = date_elem.get_text().strip()
+            # 提取日期部分
+            date_match = re.search(r'(\d{4}-\d{2}-\d{2})', date)
+            if date_match:
+                date = date_match.group(1)
+
+        return Paper(
+            arxiv_id=arxiv_id,
+            title=title,
+            authors=authors,
+            abstract=abstract,
+            date=date,
+            pdf_url=pdf_url
+        )
+
+    except Exception as e:
+        logger.warning(f"提取论文信息时出错: {e}")
+        return None
@@ -0,0 +1,125 @@
+"""
+本地 HTTP 替身，模拟 arxiv.org 的列表页、API 和 PDF 下载
+
+支持配置每个请求的延迟和错误率，基准测试通过把 ArxivCrawler 的
+base_url 指向这里来覆盖完整的网络路径，而不访问真实的 arxiv.org。
+"""
+
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from fixtures import make_atom_feed, make_listing_html, make_pdf_bytes
+
+ITEMS_PER_PAGE = 50
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        server = self.server.stub
+        server._on_request()
+        if server.latency:
+            time.sleep(server.latency)
+        if server._should_fail():
+            self._send(server.error_status, b'error', 'text/plain')
+            return
+
+        parsed = urlparse(self.path)
+        parts = parsed.path.strip('/').split('/')
+        query = parse_qs(parsed.query)
+
+        if len(parts) == 3 and parts[0] == 'list':
+            skip = int(query.get('skip', ['0'])[0])
+            show = int(query.get('show', [str(ITEMS_PER_PAGE)])[0])
+            count = max(min(show, server.total_papers - skip), 0)
+            body = make_listing_html(count, offset=skip).encode('utf-8')
+            self._send(200, body, 'text/html; charset=utf-8')
+        elif len(parts) == 2 and parts[0] == 'pdf':
+            self._send(200, server.pdf_body, 'application/pdf')
+        elif parts == ['api', 'query']:
+            self._send(200, server.atom_body, 'application/atom+xml')
+        else:
+            self._send(404, b'not found', 'text/plain')
+
+    def _send(self, status, body, content_type):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class StubArxivServer:
+    def __init__(self, total_papers: int = 200, latency: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 pdf_size: int = 64 * 1024, seed: int = 0):
+        """
+        初始化本地 arXiv 替身
+
+        Args:
+            total_papers: 每个栏目可分页获取的论文总数
+            latency: 每个请求的附加延迟（秒）
+            error_rate: 返回错误状态码的请求比例
+            error_status: 出错时返回的 HTTP 状态码
+            pdf_size: 虚拟 PDF 的字节数
+            seed: 错误注入使用的随机种子
+        """
+        self.total_papers = total_papers
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.pdf_body = make_pdf_bytes(pdf_size)
+        self.atom_body = make_atom_feed().encode('utf-8')
+        self.request_count = 0
+        self.seed = seed
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self._httpd = None
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _on_request(self):
+        with self._lock:
+            self.request_count += 1
+
+    def reseed(self):
+        """重置错误注入的随机序列，之后的请求按初始种子重新决定是否失败"""
+        with self._lock:
+            self._random.seed(self.seed)
+
+    def _should_fail(self) -> bool:
+        if not self.error_rate:
+            return False
+        with self._lock:
+            return self._random.random() < self.error_rate
+
+    def start(self) -> 'StubArxivServer':
+        self._httpd = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self._httpd.daemon_threads = True
+        self._httpd.stub = self
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        if self._httpd:
+            self._httpd.shutdown()
+            self._httpd.server_close()
+            self._httpd = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -0,0 +1,281 @@
+"""
+列表页原始响应的录制与离线重放
+
+CaptureWriter 把每个列表页响应追加写入压缩的 capture 文件（*.warc.gz），
+格式与 WARC 一致：每条记录是一个独立的 gzip member，内容为 WARC 头加上
+完整的 HTTP 响应。每个 capture 文件旁边有一个 CDX 风格的索引（*.cdx），
+记录每条记录的偏移和长度，重放时可以把记录分给多个进程并行解压和解析。
+没有索引的文件（例如其他工具生成的 WARC）按文件顺序读取。
+
+重放不访问网络，输出只取决于录制内容，适合在修改关键词逻辑后重新处理
+历史列表页，也可以作为基准测试的输入。
+"""
+
+import gzip
+import logging
+import os
+import threading
+import time
+import uuid
+import zlib
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from http import HTTPStatus
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+from urllib.parse import urlsplit
+
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+CAPTURE_SUFFIX = '.warc.gz'
+INDEX_SUFFIX = '.cdx'
+
+# 单条记录: (URI, 录制时间, HTTP 状态码, 响应体)
+Record = Tuple[str, str, int, bytes]
+
+
+class CaptureWriter:
+    def __init__(self, directory: str, max_bytes: int = 256 * 1024 * 1024):
+        """
+        初始化录制器
+
+        Args:
+            directory: capture 文件目录
+            max_bytes: 单个 capture 文件的最大字节数，超过后切换到新文件
+        """
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._file = None
+        self._index = None
+        os.makedirs(directory, exist_ok=True)
+
+    def _open(self):
+        stamp = time.strftime('%Y%m%d-%H%M%S')
+        base = os.path.join(self.directory, f"capture-{stamp}-{os.getpid()}-{uuid.uuid4().hex[:6]}")
+        self._file = open(base + CAPTURE_SUFFIX, 'ab')
+        self._index = open(base + INDEX_SUFFIX, 'a', encoding='utf-8')
+        logger.info(f"开始录制到: {base + CAPTURE_SUFFIX}")
+
+    def record(self, url: str, status: int, headers: Dict[str, str], body: bytes):
+        """追加一条响应记录"""
+        status_line = f"HTTP/1.1 {status} {HTTPStatus(status).phrase}\r\n"
+        http_headers = ''.join(f"{name}: {value}\r\n" for name, value in headers.items()
+                               if name.lower() not in ('content-length', 'content-encoding',
+                                                       'transfer-encoding'))
+        payload = (status_line + http_headers + f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body
+        date = datetime.now(timezone.utc).strftime('%Y-%m-%dT%H:%M:%SZ')
+        warc_headers = (
+            "WARC/1.1\r\n"
+            "WARC-Type: response\r\n"
+            f"WARC-Target-URI: {url}\r\n"
+            f"WARC-Date: {date}\r\n"
+            f"WARC-Record-ID: <urn:uuid:{uuid.uuid4()}>\r\n"
+            "Content-Type: application/http; msgtype=response\r\n"
+            f"Content-Length: {len(payload)}\r\n\r\n"
+        ).encode('utf-8')
+        member = gzip.compress(warc_headers + payload + b"\r\n\r\n")
+
+        with self._lock:
+            if self._file is None or self._file.tell() >= self.max_bytes:
+                self.close()
+                self._open()
+            offset = self._file.tell()
+            self._file.write(member)
+            self._file.flush()
+            self._index.write(f"{offset}\t{len(member)}\t{date}\t{status}\t{url}\n")
+            self._index.flush()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._index.close()
+            self._file = self._index = None
+
+
+def _parse_record(data: bytes) -> Optional[Record]:
+    """解析一条解压后的 WARC 记录，只返回 response 类型"""
+    head, _, rest = data.partition(b"\r\n\r\n")
+    warc = _parse_headers(head)
+    if warc.get('warc-type') != 'response':
+        return None
+    payload = rest[:int(warc.get('content-length', len(rest)))]
+    http_head, _, body = payload.partition(b"\r\n\r\n")
+    status_line, _, _ = http_head.partition(b"\r\n")
+    status = int(status_line.split()[1])
+    return warc.get('warc-target-uri', ""), warc.get('warc-date', ""), status, body
+
+
+def _parse_headers(head: bytes) -> Dict[str, str]:
+    headers = {}
+    for line in head.decode('utf-8', 'replace').split("\r\n")[1:]:
+        name, _, value = line.partition(':')
+        headers[name.strip().lower()] = value.strip()
+    return headers
+
+
+def iter_records(path: str, chunk_size: int = 64 * 1024) -> Iterator[Record]:
+    """
+    按顺序流式读取 capture 文件中的全部 response 记录
+
+    按 chunk_size 分块读取文件并送入解压器；一个 gzip member 结束时，只把当前块中
+    剩余的字节交给下一个解压器，内存占用与单条记录大小相当。
+    """
+    with open(path, 'rb') as f:
+        decompressor = zlib.decompressobj(wbits=31)
+        parts: List[bytes] = []
+        data = b""
+        while True:
+            if not data:
+                data = f.read(chunk_size)
+                if not data:
+                    break
+            parts.append(decompressor.decompress(data))
+            if not decompressor.eof:
+                data = b""
+                continue
+            record = _parse_record(b"".join(parts))
+            if record is not None:
+                yield record
+            data = decompressor.unused_data
+            decompressor = zlib.decompressobj(wbits=31)
+            parts = []
+        if parts:
+            logger.warning(f"{path} 末尾的记录不完整，已忽略")
+
+
+def read_index(path: str) -> List[Tuple[int, int, str]]:
+    """读取 capture 文件的 CDX 索引，返回 [(偏移, 长度, URI)]；没有索引时返回空列表"""
+    index_path = path[:-len(CAPTURE_SUFFIX)] + INDEX_SUFFIX
+    if not os.path.exists(index_path):
+        return []
+    entries = []
+    with open(index_path, encoding='utf-8') as f:
+        for line in f:
+            fields = line.rstrip('\n').split('\t')
+            if len(fields) >= 5:
+                entries.append((int(fields[0]), int(fields[1]), fields[4]))
+    return entries
+
+
+def find_captures(paths: Sequence[str]) -> List[str]:
+    """展开文件和目录参数，返回按文件名排序的 capture 文件列表"""
+    captures = []
+    for path in paths:
+        if os.path.isdir(path):
+            captures.extend(os.path.join(path, name) for name in os.listdir(path)
+                            if name.endswith(CAPTURE_SUFFIX))
+        else:
+            captures.append(path)
+    return sorted(captures)
+
+
+def listing_category(url: str) -> Optional[str]:
+    """从 /list/<栏目>/<时间段> 形式的 URL 中取出栏目"""
+    parts = urlsplit(url).path.strip('/').split('/')
+    if len(parts) >= 3 and parts[0] == 'list':
+        return parts[1]
+    return None
+
+
+# 重放工作进程中复用的爬虫实例，只用于解析
+_parser = None
+
+
+def _parse_listing(url: str, body: bytes) -> Tuple[str, List[Paper], Dict[str, int]]:
+    global _parser
+    from bs4 import BeautifulSoup
+    from arxiv_crawler import ArxivCrawler
+
+    if _parser is None:
+        _parser = ArxivCrawler(delay=0)
+    parts = urlsplit(url)
+    _parser.base_url = f"{parts.scheme}://{parts.netloc}"
+    _parser.parse_errors.clear()
+
+    category = listing_category(url)
+    papers = _parser._parse_paper_list(BeautifulSoup(body, 'html.parser'))
+    for paper in papers:
+        paper.category = category
+    return category, papers, dict(_parser.parse_errors)
+
+
+def _replay_members(path: str, entries: List[Tuple[int, int, str]]):
+    """解压并解析 capture 文件中指定偏移的若干条记录"""
+    results = []
+    with open(path, 'rb') as f:
+        for offset, length, _ in entries:
+            f.seek(offset)
+            record = _parse_record(zlib.decompress(f.read(length), wbits=31))
+            if record is not None and record[2] == HTTPStatus.OK and listing_category(record[0]):
+                results.append(_parse_listing(record[0], record[3]))
+    return results
+
+
+def _replay_file(path: str):
+    """没有索引的 capture 文件整体按顺序处理"""
+    return [_parse_listing(url, body) for url, _, status, body in iter_records(path)
+            if status == HTTPStatus.OK and listing_category(url)]
+
+
+def replay(paths: Sequence[str], workers: Optional[int] = None,
+           categories: Optional[Sequence[str]] = None,
+           chunk_size: int = 8) -> Dict[str, List[Paper]]:
+    """
+    离线重放 capture 文件中的列表页
+
+    有索引的文件按 chunk_size 条记录一组分给工作进程并行解压、解析；
+    结果按录制顺序合并，同一栏目中重复出现的论文只保留第一次。
+
+    Args:
+        paths: capture 文件或目录
+        workers: 工作进程数，None 为 CPU 核数，1 表示在当前进程中处理
+        categories: 只保留这些栏目，None 表示全部
+        chunk_size: 每个任务包含的记录数
+
+    Returns:
+        栏目 → 论文列表
+    """
+    tasks = []
+    for path in find_captures(paths):
+        entries = read_index(path)
+        if entries:
+            # 借助索引中的 URI，在解压之前就跳过不需要的栏目
+            if categories:
+                entries = [entry for entry in entries if listing_category(entry[2]) in categories]
+            tasks.extend((_replay_members, path, entries[i:i + chunk_size])
+                         for i in range(0, len(entries), chunk_size))
+        else:
+            tasks.append((_replay_file, path))
+    logger.info(f"开始重放 {len(tasks)} 组记录")
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        chunks = [func(*args) for func, *args in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(func, *args) for func, *args in tasks]
+            chunks = [future.result() for future in futures]
+
+    wanted = set(categories) if categories else None
+    results: Dict[str, List[Paper]] = defaultdict(list)
+    seen = defaultdict(set)
+    errors = defaultdict(int)
+    pages = 0
+    for chunk in chunks:
+        for category, papers, page_errors in chunk:
+            pages += 1
+            for reason, count in page_errors.items():
+                errors[reason] += count
+            if wanted is not None and category not in wanted:
+                continue
+            for paper in papers:
+                if paper.arxiv_id not in seen[category]:
+                    seen[category].add(paper.arxiv_id)
+                    results[category].append(paper)
+
+    logger.info(f"重放完成: {pages} 个列表页，{sum(map(len, results.values()))} 篇论文"
+                + (f"，解析失败 {dict(errors)}" if errors else ""))
+    return dict(results)
@@ -0,0 +1,229 @@
+"""
+跨栏目、跨运行的关键词对比
+
+所有栏目共享一个词表索引，每个栏目的词频是 (栏目数 x 词表大小) 矩阵中的一行。
+各栏目的特征词用对数似然比 G² 衡量（本栏目 vs 其余栏目），与上一次运行的
+差异则把上次保存的矩阵对齐到当前词表后逐元素相减，全部为 NumPy 向量化计算。
+"""
+
+import json
+import logging
+import os
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Sequence
+
+import numpy as np
+
+from keywords import tokenize
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+
+class Vocabulary:
+    """词 → 整数 ID 的共享索引"""
+
+    def __init__(self, terms: Iterable[str] = ()):
+        self.terms: List[str] = []
+        self.ids: Dict[str, int] = {}
+        for term in terms:
+            self.add(term)
+
+    def __len__(self):
+        return len(self.terms)
+
+    def add(self, term: str) -> int:
+        term_id = self.ids.get(term)
+        if term_id is None:
+            term_id = self.ids[term] = len(self.terms)
+            self.terms.append(term)
+        return term_id
+
+    def encode(self, tokens: Iterable[str]) -> np.ndarray:
+        add = self.add
+        return np.fromiter((add(token) for token in tokens), dtype=np.int64)
+
+
+def term_matrix(groups: Dict[str, Sequence[Paper]], vocab: Vocabulary) -> np.ndarray:
+    """
+    构建各栏目的词频矩阵
+
+    Returns:
+        (len(groups), len(vocab)) 的 int64 矩阵，行顺序与 groups 一致
+    """
+    encoded = []
+    for papers in groups.values():
+        ids = [vocab.encode(tokenize(paper.title + " " + paper.abstract)) for paper in papers]
+        encoded.append(np.concatenate(ids) if ids else np.empty(0, dtype=np.int64))
+
+    matrix = np.zeros((len(encoded), len(vocab)), dtype=np.int64)
+    for row, ids in enumerate(encoded):
+        matrix[row] = np.bincount(ids, minlength=len(vocab))
+    return matrix
+
+
+def log_likelihood(matrix: np.ndarray) -> np.ndarray:
+    """
+    每个栏目相对其余栏目的带符号对数似然比 G²
+
+    正值表示该词在本栏目中相对过量出现，负值表示相对不足。
+    """
+    a = matrix.astype(np.float64)
+    b = a.sum(axis=0, keepdims=True) - a           # 其余栏目中的词频
+    n_self = a.sum(axis=1, keepdims=True)
+    n_rest = n_self.sum() - n_self
+    total = n_self + n_rest
+
+    e_self = n_self * (a + b) / total
+    e_rest = n_rest * (a + b) / total
+    with np.errstate(divide='ignore', invalid='ignore'):
+        g2 = 2 * (np.where(a > 0, a * np.log(a / e_self), 0.0)
+                  + np.where(b > 0, b * np.log(b / e_rest), 0.0))
+        over = a * n_rest > b * n_self
+    return np.where(over, g2, -g2)
+
+
+def _top_indices(row: np.ndarray, k: int) -> np.ndarray:
+    k = min(k, len(row))
+    if k <= 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-row, k - 1)[:k]
+    return top[np.argsort(-row[top], kind='stable')]
+
+
+class KeywordComparison:
+    def __init__(self, groups: Dict[str, Sequence[Paper]]):
+        """
+        构建跨栏目关键词对比
+
+        Args:
+            groups: 栏目代码 → 该栏目的论文列表
+        """
+        self.categories = list(groups)
+        self.paper_counts = [len(papers) for papers in groups.values()]
+        self.vocab = Vocabulary()
+        self.matrix = term_matrix(groups, self.vocab)
+        self.g2 = log_likelihood(self.matrix) if len(self.categories) > 1 else None
+        self.previous: Optional[np.ndarray] = None
+        # 上次保存过、本次没有爬取的栏目，原样写回状态文件
+        self.carried_categories: List[str] = []
+        self.carried: Optional[np.ndarray] = None
+
+    def align_previous(self, path: str) -> bool:
+        """
+        加载上一次运行保存的状态并对齐到当前词表
+
+        Returns:
+            是否成功加载
+        """
+        if not os.path.exists(path):
+            return False
+        data = np.load(path)
+        prev_terms = data['terms'].tolist()
+        prev_categories = data['categories'].tolist()
+        prev_matrix = data['matrix']
+
+        # 上次出现过、本次没有出现的词也纳入词表，使下降的词可以被看到
+        term_ids = np.array([self.vocab.add(term) for term in prev_terms], dtype=np.int64)
+        if self.matrix.shape[1] < len(self.vocab):
+            pad = len(self.vocab) - self.matrix.shape[1]
+            self.matrix = np.pad(self.matrix, ((0, 0), (0, pad)))
+            if self.g2 is not None:
+                self.g2 = np.pad(self.g2, ((0, 0), (0, pad)))
+
+        self.previous = np.zeros_like(self.matrix)
+        row_of = {category: i for i, category in enumerate(prev_categories)}
+        for row, category in enumerate(self.categories):
+            prev_row = row_of.pop(category, None)
+            if prev_row is not None:
+                self.previous[row, term_ids] = prev_matrix[prev_row]
+
+        self.carried_categories = list(row_of)
+        self.carried = np.zeros((len(row_of), len(self.vocab)), dtype=np.int64)
+        for row, prev_row in enumerate(row_of.values()):
+            self.carried[row, term_ids] = prev_matrix[prev_row]
+        return True
+
+    def save_state(self, path: str):
+        """
+        保存本次词频矩阵，供下一次运行计算差异
+
+        本次爬取的栏目保存本次的词频，本次没有爬取的栏目保留上次保存的词频。
+        只保存至少在一个栏目中出现过的词，状态文件不会随运行次数无限增长。
+        """
+        categories = self.categories + self.carried_categories
+        matrix = self.matrix
+        if self.carried_categories:
+            matrix = np.vstack([matrix, self.carried])
+        columns = np.flatnonzero((matrix != 0).any(axis=0))
+        terms = self.vocab.terms
+        np.savez_compressed(
+            path,
+            terms=np.array([terms[i] for i in columns], dtype=str),
+            categories=np.array(categories, dtype=str),
+            matrix=matrix[:, columns].astype(np.int32)
+        )
+
+    def deltas(self) -> Optional[np.ndarray]:
+        """本次与上次的每百万词频率之差 (栏目数 x 词表大小)"""
+        if self.previous is None:
+            return None
+        current = self.matrix / np.maximum(self.matrix.sum(axis=1, keepdims=True), 1)
+        previous = self.previous / np.maximum(self.previous.sum(axis=1, keepdims=True), 1)
+        # 上次没有该栏目的数据时不计算差异
+        has_previous = self.previous.sum(axis=1, keepdims=True) > 0
+        return np.where(has_previous, (current - previous) * 1e6, 0.0)
+
+    def report(self, top_n: int = 20) -> Dict:
+        """生成对比报告"""
+        terms = self.vocab.terms
+        deltas = self.deltas()
+        categories = {}
+        for row, category in enumerate(self.categories):
+            counts = self.matrix[row]
+            entry = {
+                'papers': self.paper_counts[row],
+                'tokens': int(counts.sum()),
+                'top_terms': [{'term': terms[i], 'count': int(counts[i])}
+                              for i in _top_indices(counts, top_n) if counts[i] > 0]
+            }
+            if self.g2 is not None:
+                entry['distinctive'] = [
+                    {'term': terms[i], 'g2': round(float(self.g2[row, i]), 2), 'count': int(counts[i])}
+                    for i in _top_indices(self.g2[row], top_n) if self.g2[row, i] > 0
+                ]
+            if deltas is not None:
+                entry['rising'] = [
+                    {'term': terms[i], 'delta_per_million': round(float(deltas[row, i]), 1)}
+                    for i in _top_indices(deltas[row], top_n) if deltas[row, i] > 0
+                ]
+                entry['falling'] = [
+                    {'term': terms[i], 'delta_per_million': round(float(deltas[row, i]), 1)}
+                    for i in _top_indices(-deltas[row], top_n) if deltas[row, i] < 0
+                ]
+            categories[category] = entry
+        return {
+            'timestamp': datetime.now().isoformat(),
+            'vocabulary_size': len(self.vocab),
+            'categories': categories
+        }
+
+
+def write_keyword_report(groups: Dict[str, Sequence[Paper]], report_file: str,
+                         top_n: int = 20) -> Dict:
+    """
+    生成跨栏目关键词对比报告，并与上一次运行的结果比较
+
+    上一次运行的词频矩阵保存在 report_file 同名的 .npz 文件中。
+    """
+    state_file = os.path.splitext(report_file)[0] + '.npz'
+    comparison = KeywordComparison(groups)
+    if comparison.align_previous(state_file):
+        logger.info(f"已加载上次运行的关键词状态: {state_file}")
+    report = comparison.report(top_n=top_n)
+
+    with open(report_file, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    comparison.save_state(state_file)
+    logger.info(f"关键词对比报告已保存到: {report_file}")
+    return report
@@ -0,0 +1,35 @@
+"""
+关键词分词与计数
+
+extract_keywords、PaperBatch 等共用的分词规则和停用词表，保证各处统计口径一致。
+"""
+
+import re
+from collections import Counter
+from typing import Iterable, List
+
+# 至少 3 个字母的英文单词
+WORD_PATTERN = re.compile(r'\b[a-zA-Z]{3,}\b')
+
+STOP_WORDS = frozenset({
+    'the', 'a', 'an', 'and', 'or', 'but', 'in', 'on', 'at', 'to', 'for',
+    'of', 'with', 'by', 'from', 'up', 'about', 'into', 'through', 'during',
+    'before', 'after', 'above', 'below', 'between', 'among', 'is', 'are',
+    'was', 'were', 'be', 'been', 'being', 'have', 'has', 'had', 'do', 'does',
+    'did', 'will', 'would', 'could', 'should', 'may', 'might', 'must', 'can',
+    'this', 'that', 'these', 'those', 'i', 'you', 'he', 'she', 'it', 'we', 'they',
+    'me', 'him', 'her', 'us', 'them', 'my', 'your', 'his', 'her', 'its', 'our', 'their'
+})
+
+
+def tokenize(text: str, stop_words: frozenset = STOP_WORDS) -> List[str]:
+    """把文本切分为小写关键词，并过滤停用词"""
+    return [word for word in WORD_PATTERN.findall(text.lower()) if word not in stop_words]
+
+
+def count_keywords(texts: Iterable[str], stop_words: frozenset = STOP_WORDS) -> Counter:
+    """统计多段文本的关键词词频"""
+    counts = Counter()
+    for text in texts:
+        counts.update(tokenize(text, stop_words))
+    return counts
@@ -0,0 +1,202 @@
+"""
+论文记录类型
+
+Paper 使用 __slots__ 存储单篇论文，栏目、作者和日期字符串经过 intern，
+在大规模语料中重复出现的字符串只保留一份。PaperBatch 按列存储一批论文，
+用于关键词统计、导出等批量操作。
+"""
+
+import re
+import sys
+from array import array
+from collections import Counter
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Union
+
+from keywords import STOP_WORDS, count_keywords
+
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    NUMPY_AVAILABLE = False
+
+_intern = sys.intern
+
+_ISO_DATE = re.compile(r'\d{4}-\d{2}-\d{2}')
+
+
+class Paper:
+    """单篇论文信息，JSON 字段与旧版字典保持一致"""
+
+    __slots__ = ('arxiv_id', 'title', 'authors', 'abstract', 'date', 'pdf_url', 'category')
+
+    def __init__(self, arxiv_id: str, title: str, authors: Iterable[str] = (),
+                 abstract: str = "", date: str = "", pdf_url: str = "",
+                 category: Optional[str] = None):
+        self.arxiv_id = arxiv_id
+        self.title = title
+        self.authors = tuple(_intern(author) for author in authors)
+        self.abstract = abstract
+        self.date = _intern(date)
+        self.pdf_url = pdf_url
+        self.category = _intern(category) if category else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """转换为旧版字典格式，category 仅在已知时输出"""
+        data = {
+            'arxiv_id': self.arxiv_id,
+            'title': self.title,
+            'authors': list(self.authors),
+            'abstract': self.abstract,
+            'date': self.date,
+            'pdf_url': self.pdf_url
+        }
+        if self.category:
+            data['category'] = self.category
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'Paper':
+        """从旧版字典（或 JSON）构造，兼容早期的 pdf_link 字段"""
+        return cls(
+            arxiv_id=data['arxiv_id'],
+            title=data.get('title', ""),
+            authors=data.get('authors', ()),
+            abstract=data.get('abstract', ""),
+            date=data.get('date', ""),
+            pdf_url=data.get('pdf_url') or data.get('pdf_link', ""),
+            category=data.get('category')
+        )
+
+    # 兼容按字典方式访问的旧代码，如 paper['title']
+    def __getitem__(self, key: str):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default=None):
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
+
+    def __eq__(self, other):
+        if not isinstance(other, Paper):
+            return NotImplemented
+        return all(getattr(self, name) == getattr(other, name) for name in self.__slots__)
+
+    # 只按 arxiv_id 计算：相等的论文 ID 必然相同，修改其他字段不会改变哈希值
+    def __hash__(self):
+        return hash(self.arxiv_id)
+
+    def __repr__(self):
+        return f"Paper(arxiv_id={self.arxiv_id!r}, title={self.title[:40]!r})"
+
+
+def paper_to_json(obj):
+    """json.dump 的 default 回调，使 Paper 可以直接序列化"""
+    if isinstance(obj, Paper):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class PaperBatch:
+    """
+    按列存储的一批论文
+
+    作者按 CSR 方式展平：第 i 篇论文的作者为
+    author_names[author_offsets[i]:author_offsets[i + 1]]。
+    """
+
+    def __init__(self):
+        self.arxiv_ids: List[str] = []
+        self.titles: List[str] = []
+        self.abstracts: List[str] = []
+        self.dates: List[str] = []
+        self.pdf_urls: List[str] = []
+        self.categories: List[Optional[str]] = []
+        self.author_names: List[str] = []
+        self.author_offsets = array('q', [0])
+
+    @classmethod
+    def from_papers(cls, papers: Iterable[Union[Paper, Dict]]) -> 'PaperBatch':
+        batch = cls()
+        batch.extend(papers)
+        return batch
+
+    def append(self, paper: Union[Paper, Dict]):
+        if not isinstance(paper, Paper):
+            paper = Paper.from_dict(paper)
+        self.arxiv_ids.append(paper.arxiv_id)
+        self.titles.append(paper.title)
+        self.abstracts.append(paper.abstract)
+        self.dates.append(paper.date)
+        self.pdf_urls.append(paper.pdf_url)
+        self.categories.append(paper.category)
+        self.author_names.extend(paper.authors)
+        self.author_offsets.append(len(self.author_names))
+
+    def extend(self, papers: Iterable[Union[Paper, Dict]]):
+        for paper in papers:
+            self.append(paper)
+
+    def __len__(self):
+        return len(self.arxiv_ids)
+
+    def __getitem__(self, index: int) -> Paper:
+        return Paper(
+            arxiv_id=self.arxiv_ids[index],
+            title=self.titles[index],
+            authors=self.authors_of(index),
+            abstract=self.abstracts[index],
+            date=self.dates[index],
+            pdf_url=self.pdf_urls[index],
+            category=self.categories[index]
+        )
+
+    def __iter__(self) -> Iterator[Paper]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def authors_of(self, index: int) -> List[str]:
+        if index < 0:
+            index += len(self)
+        return self.author_names[self.author_offsets[index]:self.author_offsets[index + 1]]
+
+    def texts(self) -> Iterator[str]:
+        """逐篇返回 标题 + 摘要 文本"""
+        return (title + " " + abstract for title, abstract in zip(self.titles, self.abstracts))
+
+    def keyword_counts(self, stop_words: frozenset = STOP_WORDS) -> Counter:
+        """统计整批论文的关键词词频，口径与 extract_keywords 一致"""
+        return count_keywords(self.texts(), stop_words)
+
+    def category_counts(self) -> Counter:
+        return Counter(self.categories)
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """导出为旧版字典列表，可直接写入 JSON"""
+        return [paper.to_dict() for paper in self]
+
+    def to_numpy(self) -> Dict[str, Any]:
+        """
+        导出为 NumPy 列
+
+        Returns:
+            字典，包含 arxiv_id、date（datetime64[D]，缺失为 NaT）、
+            category_codes / category_names（栏目编码）和 author_counts
+        """
+        if not NUMPY_AVAILABLE:
+            raise ImportError("to_numpy 需要安装 numpy")
+
+        category_names, category_codes = np.unique(
+            np.array([c or "" for c in self.categories]), return_inverse=True
+        )
+        dates = [d if _ISO_DATE.fullmatch(d) else 'NaT' for d in self.dates]
+        offsets = np.frombuffer(self.author_offsets, dtype=np.int64)
+        return {
+            'arxiv_id': np.array(self.arxiv_ids, dtype=str),
+            'date': np.array(dates, dtype='datetime64[D]'),
+            'category_codes': category_codes.astype(np.int32),
+            'category_names': category_names,
+            'author_counts': np.diff(offsets).astype(np.int32)
+        }
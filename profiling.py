@@ -0,0 +1,209 @@
+"""
+按阶段的性能剖析工具
+
+在 cProfile 和/或 tracemalloc 下运行爬取流程，按阶段（listing、parsing、
+keywords、wordcloud、downloads）分别统计，并把 .pstats 和内存分配报告
+写到输出目录。支持按比例抽样，只剖析一部分运行，适合在生产环境常开。
+"""
+
+import cProfile
+import contextlib
+import logging
+import os
+import pstats
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cpu', 'mem', 'both')
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+# 快照本身的分配不计入报告
+_SNAPSHOT_FILTERS = [tracemalloc.Filter(False, tracemalloc.__file__)]
+
+
+class _Stage:
+    """单次进入某个阶段的上下文"""
+
+    __slots__ = ('profiler', 'name', 'started')
+
+    def __init__(self, profiler: 'StageProfiler', name: str):
+        self.profiler = profiler
+        self.name = name
+        self.started = 0.0
+
+    def __enter__(self):
+        self.profiler._enter(self.name)
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.profiler._wall[self.name] += time.perf_counter() - self.started
+        self.profiler._calls[self.name] += 1
+        self.profiler._exit(self.name)
+        return False
+
+
+class StageProfiler:
+    def __init__(self, mode: Optional[str] = None, output_dir: str = "profiles",
+                 top_n: int = 25, nframe: int = 1):
+        """
+        初始化阶段剖析器
+
+        Args:
+            mode: 'cpu'、'mem'、'both'，None 表示不剖析
+            output_dir: 报告输出目录
+            top_n: 内存报告中列出的分配位置数量
+            nframe: tracemalloc 记录的调用栈深度，越小开销越低
+        """
+        if mode is not None and mode not in PROFILE_MODES:
+            raise ValueError(f"不支持的剖析模式: {mode}")
+        self.mode = mode
+        self.output_dir = output_dir
+        self.top_n = top_n
+        self.nframe = nframe
+        self.cpu = mode in ('cpu', 'both')
+        self.mem = mode in ('mem', 'both')
+        self.run_id = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        self._stack: List[str] = []
+        self._cpu_profiles: Dict[str, cProfile.Profile] = {}
+        self._mem_base: Dict[str, int] = {}  # 阶段本段开始时的已分配字节数
+        self._mem_net: Dict[str, int] = defaultdict(int)
+        self._mem_peak: Dict[str, int] = defaultdict(int)
+        self._wall: Dict[str, float] = defaultdict(float)
+        self._calls: Dict[str, int] = defaultdict(int)
+        self._started_tracemalloc = False
+
+    @classmethod
+    def sampled(cls, mode: Optional[str], sample_rate: float = 1.0,
+                **kwargs) -> 'StageProfiler':
+        """
+        按抽样率决定本次运行是否剖析
+
+        sample_rate 为 0.05 时大约每 20 次运行剖析一次，未抽中时返回的剖析器
+        不做任何事，开销只有一次属性判断。
+        """
+        if mode and random.random() >= sample_rate:
+            logger.debug("本次运行未被抽中剖析")
+            mode = None
+        return cls(mode, **kwargs)
+
+    @property
+    def enabled(self) -> bool:
+        return self.mode is not None
+
+    def stage(self, name: str):
+        """返回阶段上下文管理器，未启用时返回空上下文"""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _Stage(self, name)
+
+    def _enter(self, name: str):
+        # cProfile 同一时刻只能有一个活动的剖析器，进入嵌套阶段时先暂停外层
+        if self._stack:
+            self._pause(self._stack[-1])
+        self._stack.append(name)
+        self._resume(name)
+
+    def _exit(self, name: str):
+        self._pause(name)
+        self._stack.pop()
+        if self._stack:
+            self._resume(self._stack[-1])
+
+    def _resume(self, name: str):
+        # 内存只记录已分配字节数的差值和阶段内的峰值，开销与堆大小无关；
+        # 分配位置的快照只在 dump 时取一次
+        if self.mem:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.nframe)
+                self._started_tracemalloc = True
+            tracemalloc.reset_peak()
+            self._mem_base[name] = tracemalloc.get_traced_memory()[0]
+        if self.cpu:
+            profile = self._cpu_profiles.get(name)
+            if profile is None:
+                profile = self._cpu_profiles[name] = cProfile.Profile()
+            profile.enable()
+
+    def _pause(self, name: str):
+        if self.cpu:
+            self._cpu_profiles[name].disable()
+        if self.mem:
+            current, peak = tracemalloc.get_traced_memory()
+            base = self._mem_base.pop(name)
+            self._mem_net[name] += current - base
+            self._mem_peak[name] = max(self._mem_peak[name], peak - base)
+
+    def stats(self) -> Dict[str, Dict]:
+        """
+        各阶段的汇总统计
+
+        嵌套阶段运行期间外层阶段处于暂停状态，内层的耗时和内存不计入外层。
+
+        Returns:
+            阶段名 → {'calls', 'wall', 'mem_net', 'mem_peak'}；mem_net 为阶段内
+            净分配的字节数，mem_peak 为阶段内已分配内存相对进入时的最大增量
+        """
+        return {name: {'calls': self._calls[name],
+                       'wall': self._wall[name],
+                       'mem_net': self._mem_net.get(name, 0),
+                       'mem_peak': self._mem_peak.get(name, 0)}
+                for name in self._calls}
+
+    def dump(self) -> List[str]:
+        """
+        写出各阶段报告
+
+        Returns:
+            生成的文件路径列表
+        """
+        if not self.enabled or not self._calls:
+            return []
+
+        os.makedirs(self.output_dir, exist_ok=True)
+        prefix = os.path.join(self.output_dir, f"profile_{self.run_id}")
+        written = []
+
+        for name, profile in self._cpu_profiles.items():
+            path = f"{prefix}_{name}.pstats"
+            profile.dump_stats(path)
+            written.append(path)
+
+        stats = self.stats()
+        if self.mem and tracemalloc.is_tracing():
+            snapshot = tracemalloc.take_snapshot().filter_traces(_SNAPSHOT_FILTERS)
+            path = f"{prefix}_mem.txt"
+            with open(path, 'w', encoding='utf-8') as f:
+                for name, stage in stats.items():
+                    f.write(f"阶段: {name:<12} 峰值内存: {stage['mem_peak'] / 1024:.1f} KiB  "
+                            f"净分配: {stage['mem_net'] / 1024:.1f} KiB\n")
+                f.write(f"\n当前仍占用内存的分配位置 Top {self.top_n}:\n")
+                for stat in snapshot.statistics('lineno')[:self.top_n]:
+                    f.write(f"{stat.size / 1024:10.1f} KiB  {stat.traceback[0]}\n")
+            written.append(path)
+
+        path = f"{prefix}_summary.txt"
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(f"模式: {self.mode}\n")
+            for name, stage in stats.items():
+                f.write(f"{name:<12} 次数: {stage['calls']:<6} "
+                        f"耗时: {stage['wall']:.3f}s\n")
+                if name in self._cpu_profiles:
+                    stats = pstats.Stats(self._cpu_profiles[name], stream=f)
+                    stats.sort_stats('cumulative').print_stats(10)
+        written.append(path)
+
+        if self._started_tracemalloc:
+            tracemalloc.stop()
+            self._started_tracemalloc = False
+
+        logger.info(f"剖析报告已保存到: {self.output_dir}")
+        return written
@@ -0,0 +1,229 @@
+"""
+爬取与下载的进度汇报
+
+ProgressReporter 按阶段（listing、downloads 等）汇总进度，多个线程可以同时
+更新同一个阶段。每个阶段记录完成数、总数、字节数、进行中的请求数和
+限速等待时间，并据此计算速率和预计剩余时间。
+- bar: 在终端中为每个阶段显示一个 tqdm 进度条；
+- json: 按固定间隔向 stderr 输出一行 JSON，适合 cron 等非终端日志，需要显式指定；
+- auto: 终端且安装了 tqdm 时用 bar，否则与 off 相同，不改变非终端的输出；
+- off: 只计数，不输出。
+"""
+
+import contextlib
+import json
+import logging
+import sys
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from tqdm import tqdm
+    from tqdm.contrib.logging import logging_redirect_tqdm
+    TQDM_AVAILABLE = True
+except ImportError:
+    TQDM_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+PROGRESS_MODES = ('auto', 'bar', 'json', 'off')
+
+
+class StageProgress:
+    """单个阶段的进度计数，所有方法都是线程安全的"""
+
+    def __init__(self, name: str, unit: str, bar=None):
+        self.name = name
+        self.unit = unit
+        self.total: Optional[int] = None
+        self.done = 0
+        self.failed = 0
+        self.bytes = 0
+        self.in_flight = 0
+        self.wait_seconds = 0.0
+        self.started = time.monotonic()
+        self._lock = threading.Lock()
+        self._bar = bar
+        self._bar_mark = (self.started, 0)  # 上次更新进度条速率时的 (时间, 字节数)
+        self._bar_rate = 0.0
+
+    def add_total(self, count: int):
+        """增加（或减少）预期总数"""
+        with self._lock:
+            self.total = max((self.total or 0) + count, self.done)
+            if self._bar is not None:
+                self._bar.total = self.total
+                self._bar.refresh()
+
+    def advance(self, count: int = 1, nbytes: int = 0, failed: bool = False):
+        with self._lock:
+            self.done += count
+            self.bytes += nbytes
+            if failed:
+                self.failed += count
+            if self._bar is not None:
+                self._bar.set_postfix_str(self._postfix(), refresh=False)
+                self._bar.update(count)
+
+    def add_bytes(self, nbytes: int):
+        with self._lock:
+            self.bytes += nbytes
+
+    def add_wait(self, seconds: float):
+        """记录限速等待的时间"""
+        with self._lock:
+            self.wait_seconds += seconds
+
+    @contextlib.contextmanager
+    def active(self):
+        """标记一个进行中的请求"""
+        with self._lock:
+            self.in_flight += 1
+        try:
+            yield self
+        finally:
+            with self._lock:
+                self.in_flight -= 1
+
+    def _postfix(self) -> str:
+        # 进度条显示最近至少 1 秒内的吞吐，而不是整个阶段的平均值
+        now = time.monotonic()
+        mark_time, mark_bytes = self._bar_mark
+        if now - mark_time >= 1.0:
+            self._bar_rate = (self.bytes - mark_bytes) / (now - mark_time)
+            self._bar_mark = (now, self.bytes)
+        parts = [f"{self._bar_rate / 1e6:.2f}MB/s", f"并发={self.in_flight}",
+                 f"限速等待={self.wait_seconds:.0f}s"]
+        if self.failed:
+            parts.append(f"失败={self.failed}")
+        return ' '.join(parts)
+
+    def snapshot(self, since: Optional[Tuple[float, int, int]] = None) -> Dict:
+        """
+        当前进度，不改变任何状态
+
+        Args:
+            since: 之前由 mark() 得到的 (时间, 完成数, 字节数)；rate 和 bytes_per_sec
+                是自那时以来的速率，None 表示从阶段开始计算
+
+        Returns:
+            进度字典，avg_rate 是整个阶段的平均速率
+        """
+        return self._snapshot(since)[0]
+
+    def mark(self) -> Tuple[float, int, int]:
+        """返回当前的 (时间, 完成数, 字节数)，供之后的 snapshot 计算窗口速率"""
+        with self._lock:
+            return time.monotonic(), self.done, self.bytes
+
+    def _snapshot(self, since):
+        with self._lock:
+            now = time.monotonic()
+            elapsed = now - self.started
+            last_time, last_done, last_bytes = since or (self.started, 0, 0)
+            window = now - last_time
+            avg_rate = self.done / elapsed if elapsed > 0 else 0.0
+            rate = (self.done - last_done) / window if window > 0 else avg_rate
+            remaining = None if self.total is None else self.total - self.done
+            eta_rate = rate or avg_rate
+            return {
+                'stage': self.name,
+                'unit': self.unit,
+                'done': self.done,
+                'total': self.total,
+                'failed': self.failed,
+                'bytes': self.bytes,
+                'in_flight': self.in_flight,
+                'elapsed': round(elapsed, 1),
+                'rate': round(rate, 3),
+                'avg_rate': round(avg_rate, 3),
+                'bytes_per_sec': round((self.bytes - last_bytes) / window, 1) if window > 0 else 0.0,
+                'eta': round(remaining / eta_rate, 1) if remaining is not None and eta_rate > 0 else None,
+                # 限速等待占用的时间比例，接近 1 说明瓶颈在限速而不是带宽
+                'wait_ratio': round(min(self.wait_seconds / elapsed, 1.0), 3) if elapsed > 0 else 0.0,
+            }, (now, self.done, self.bytes)
+
+    def close(self):
+        if self._bar is not None:
+            self._bar.close()
+            self._bar = None
+
+
+class ProgressReporter:
+    def __init__(self, mode: str = 'off', interval: float = 10.0, stream=None):
+        """
+        初始化进度汇报
+
+        Args:
+            mode: 输出方式，见 PROGRESS_MODES
+            interval: json 模式的输出间隔（秒）
+            stream: 输出流，默认 stderr
+        """
+        self.stream = stream or sys.stderr
+        if mode == 'auto':
+            is_tty = hasattr(self.stream, 'isatty') and self.stream.isatty()
+            mode = 'bar' if is_tty and TQDM_AVAILABLE else 'off'
+        if mode == 'bar' and not TQDM_AVAILABLE:
+            logger.warning("进度条需要安装 tqdm 包，改为输出 JSON 行")
+            mode = 'json'
+        self.mode = mode
+        self.interval = interval
+        self.stages: Dict[str, StageProgress] = {}
+        self._marks: Dict[str, Tuple[float, int, int]] = {}  # 各阶段上一次输出时的计数
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._log_redirect = None
+
+        if mode == 'json':
+            self._thread = threading.Thread(target=self._emit_loop, name='progress', daemon=True)
+            self._thread.start()
+        elif mode == 'bar':
+            # 日志经由 tqdm.write 输出，避免打断进度条
+            self._log_redirect = logging_redirect_tqdm()
+            self._log_redirect.__enter__()
+
+    def stage(self, name: str, unit: str = 'it') -> StageProgress:
+        """返回（必要时创建）某个阶段的进度"""
+        with self._lock:
+            stage = self.stages.get(name)
+            if stage is None:
+                bar = None
+                if self.mode == 'bar':
+                    bar = tqdm(desc=name, unit=unit, position=len(self.stages),
+                               file=self.stream, dynamic_ncols=True, leave=True)
+                stage = self.stages[name] = StageProgress(name, unit, bar)
+            return stage
+
+    def snapshot(self) -> List[Dict]:
+        """各阶段的进度，速率按上一次 JSON 输出以来的窗口计算"""
+        with self._lock:
+            stages = list(self.stages.values())
+        return [stage.snapshot(self._marks.get(stage.name)) for stage in stages]
+
+    def _emit(self):
+        with self._lock:
+            stages = list(self.stages.values())
+        for stage in stages:
+            entry, self._marks[stage.name] = stage._snapshot(self._marks.get(stage.name))
+            entry['time'] = round(time.time(), 3)
+            self.stream.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        self.stream.flush()
+
+    def _emit_loop(self):
+        while not self._stop.wait(self.interval):
+            self._emit()
+
+    def close(self):
+        """停止汇报，json 模式会输出最后一次汇总"""
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+            self._emit()
+        for stage in self.stages.values():
+            stage.close()
+        if self._log_redirect is not None:
+            self._log_redirect.__exit__(None, None, None)
+            self._log_redirect = None
@@ -0,0 +1,140 @@
+"""
+持久化的已见 arXiv ID 集合
+
+SeenIdSet 由两部分组成：
+- 内存映射的 Bloom 过滤器（<path>.bloom），启动时无需读取全部 ID，
+  绝大多数"没见过"的查询只需检查几个比特；
+- SQLite 精确表（<path>.sqlite），只在 Bloom 过滤器判断"可能见过"时查询，
+  用来排除误判，因此判断结果是精确的。
+
+默认容量 200 万个 ID、误判率 1%，Bloom 文件约 2.3 MB。超出容量后结果
+仍然精确，只是需要回查 SQLite 的比例会升高。
+"""
+
+import hashlib
+import logging
+import math
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+from typing import Iterable
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b'ARXBLOOM'
+_HEADER = struct.Struct('<8sQI')  # 魔数, 比特数, 哈希函数个数
+_MASK64 = (1 << 64) - 1
+
+
+def bloom_parameters(capacity: int, error_rate: float):
+    """按容量和目标误判率计算 (比特数, 哈希函数个数)"""
+    bits = math.ceil(-capacity * math.log(error_rate) / (math.log(2) ** 2))
+    bits = (bits + 7) // 8 * 8
+    hashes = max(1, round(bits / capacity * math.log(2)))
+    return bits, hashes
+
+
+class SeenIdSet:
+    def __init__(self, path: str, capacity: int = 2_000_000, error_rate: float = 0.01):
+        """
+        打开（或创建）已见 ID 集合
+
+        Args:
+            path: 文件路径前缀，实际文件为 <path>.bloom 和 <path>.sqlite
+            capacity: 预期的 ID 数量，仅在新建 Bloom 文件时使用
+            error_rate: Bloom 过滤器的目标误判率，仅在新建时使用
+        """
+        self.path = path
+        self.bloom_path = path + '.bloom'
+        self.db_path = path + '.sqlite'
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('CREATE TABLE IF NOT EXISTS seen (arxiv_id TEXT PRIMARY KEY) WITHOUT ROWID')
+
+        rebuild = not os.path.exists(self.bloom_path)
+        if rebuild:
+            bits, hashes = bloom_parameters(capacity, error_rate)
+            with open(self.bloom_path, 'wb') as f:
+                f.write(_HEADER.pack(_MAGIC, bits, hashes))
+                f.truncate(_HEADER.size + bits // 8)
+
+        self._file = open(self.bloom_path, 'r+b')
+        self._bits = mmap.mmap(self._file.fileno(), 0)
+        magic, self.num_bits, self.num_hashes = _HEADER.unpack_from(self._bits)
+        if magic != _MAGIC:
+            raise ValueError(f"不是有效的 Bloom 过滤器文件: {self.bloom_path}")
+
+        if rebuild:
+            # Bloom 文件丢失时从精确表重建
+            ids = [row[0] for row in self._db.execute('SELECT arxiv_id FROM seen')]
+            for arxiv_id in ids:
+                self._set(arxiv_id)
+            if ids:
+                logger.info(f"已从 {self.db_path} 重建 Bloom 过滤器: {len(ids)} 个 ID")
+
+    def _positions(self, arxiv_id: str):
+        digest = hashlib.blake2b(arxiv_id.encode('utf-8'), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'little')
+        h2 = int.from_bytes(digest[8:], 'little') | 1
+        for i in range(self.num_hashes):
+            yield _HEADER.size * 8 + ((h1 + i * h2) & _MASK64) % self.num_bits
+
+    def _set(self, arxiv_id: str):
+        bits = self._bits
+        for pos in self._positions(arxiv_id):
+            bits[pos >> 3] |= 1 << (pos & 7)
+
+    def might_contain(self, arxiv_id: str) -> bool:
+        """只查 Bloom 过滤器：False 表示一定没见过，True 表示可能见过"""
+        bits = self._bits
+        return all(bits[pos >> 3] & (1 << (pos & 7)) for pos in self._positions(arxiv_id))
+
+    def __contains__(self, arxiv_id: str) -> bool:
+        if not self.might_contain(arxiv_id):
+            return False
+        with self._lock:
+            row = self._db.execute('SELECT 1 FROM seen WHERE arxiv_id = ?', (arxiv_id,)).fetchone()
+        return row is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._db.execute('SELECT COUNT(*) FROM seen').fetchone()[0]
+
+    def add(self, arxiv_id: str):
+        self.update((arxiv_id,))
+
+    def update(self, arxiv_ids: Iterable[str]) -> int:
+        """
+        批量加入 ID
+
+        Returns:
+            新加入的 ID 数量
+        """
+        ids = [arxiv_id for arxiv_id in arxiv_ids if arxiv_id]
+        if not ids:
+            return 0
+        with self._lock:
+            # 先置位再写精确表：中途退出只会多出误判，不会漏判
+            for arxiv_id in ids:
+                self._set(arxiv_id)
+            before = self._db.total_changes
+            with self._db:
+                self._db.executemany('INSERT OR IGNORE INTO seen (arxiv_id) VALUES (?)',
+                                     ((arxiv_id,) for arxiv_id in ids))
+            return self._db.total_changes - before
+
+    def flush(self):
+        self._bits.flush()
+
+    def close(self):
+        self._bits.flush()
+        self._bits.close()
+        self._file.close()
+        self._db.close()
@@ -0,0 +1,527 @@
+#!/usr/bin/env python3
+"""
+摘要语义向量、相似检索与主题聚类（仅 CPU）
+
+把 标题 + 摘要 转为稠密向量：默认使用哈希 TF-IDF + 随机化截断 SVD，
+安装了 sentence-transformers 时也可以改用本地小模型。向量保存在
+内存映射的 float32 矩阵中，余弦 Top-K 相似检索和 mini-batch k-means
+主题聚类都按块在 NumPy 中完成，每个聚类用其代表性关键词标注。
+"""
+
+import argparse
+import json
+import logging
+import math
+import os
+import zlib
+from collections import Counter
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from keywords import STOP_WORDS, count_keywords, tokenize
+from paper import Paper
+from store import load_corpus
+
+try:
+    from sentence_transformers import SentenceTransformer
+    SENTENCE_TRANSFORMERS_AVAILABLE = True
+except ImportError:
+    SENTENCE_TRANSFORMERS_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+
+def paper_text(paper: Paper) -> str:
+    return paper.title + " " + paper.abstract
+
+
+def _normalize_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return matrix / norms
+
+
+class HashedTfidfEmbedder:
+    def __init__(self, dim: int = 128, n_features: int = 2 ** 14, oversample: int = 10,
+                 n_iter: int = 1, batch_size: int = 1024, seed: int = 0):
+        """
+        哈希 TF-IDF + 随机化截断 SVD 向量化器
+
+        Args:
+            dim: 输出向量维度
+            n_features: 哈希空间大小
+            oversample: 随机化 SVD 的过采样列数
+            n_iter: 幂迭代次数，越大越准确但需要多扫描两遍数据
+            batch_size: 每批稠密化的文档数，决定峰值内存
+            seed: 随机种子
+        """
+        self.dim = dim
+        self.n_features = n_features
+        self.oversample = oversample
+        self.n_iter = n_iter
+        self.batch_size = batch_size
+        self.seed = seed
+        self.idf: Optional[np.ndarray] = None
+        self.components: Optional[np.ndarray] = None
+        self._token_cache: Dict[str, Tuple[int, float]] = {}
+
+    def _hash_token(self, token: str) -> Tuple[int, float]:
+        cached = self._token_cache.get(token)
+        if cached is None:
+            h = zlib.crc32(token.encode('utf-8'))
+            # 低位决定列，最高位决定符号，减小哈希碰撞带来的偏差
+            cached = (h % self.n_features, -1.0 if h & 0x80000000 else 1.0)
+            self._token_cache[token] = cached
+        return cached
+
+    def _sparse(self, texts: Iterable[str]) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """把文本转为 CSR 形式的次线性词频 (indptr, indices, values)"""
+        indptr = [0]
+        indices: List[int] = []
+        values: List[float] = []
+        for text in texts:
+            counts = Counter(tokenize(text, STOP_WORDS))
+            for token, count in counts.items():
+                column, sign = self._hash_token(token)
+                indices.append(column)
+                values.append(sign * (1.0 + math.log(count)))
+            indptr.append(len(indices))
+        return (np.asarray(indptr, dtype=np.int64), np.asarray(indices, dtype=np.int32),
+                np.asarray(values, dtype=np.float32))
+
+    def _batches(self, csr) -> Iterable[Tuple[int, int, np.ndarray]]:
+        """逐批返回 L2 归一化后的稠密 TF-IDF 矩阵"""
+        indptr, indices, values = csr
+        n = len(indptr) - 1
+        for start in range(0, n, self.batch_size):
+            end = min(start + self.batch_size, n)
+            lo, hi = indptr[start], indptr[end]
+            rows = np.repeat(np.arange(end - start), np.diff(indptr[start:end + 1]))
+            dense = np.zeros((end - start, self.n_features), dtype=np.float32)
+            cols = indices[lo:hi]
+            np.add.at(dense, (rows, cols), values[lo:hi] * self.idf[cols])
+            yield start, end, _normalize_rows(dense)
+
+    def fit_transform(self, texts: Sequence[str]) -> np.ndarray:
+        """拟合 IDF 和 SVD 投影，并返回训练文本的归一化向量"""
+        csr = self._sparse(texts)
+        indptr, indices, _ = csr
+        n = len(indptr) - 1
+        logger.info(f"开始拟合语义向量: {n} 篇文档，{len(self._token_cache)} 个不同词")
+
+        df = np.bincount(indices, minlength=self.n_features)
+        self.idf = (np.log((1 + n) / (1 + df)) + 1).astype(np.float32)
+
+        # 随机化 SVD：Y = A @ Omega，经过幂迭代后正交化得到 Q，再对 B = Q^T A 做 SVD
+        rng = np.random.default_rng(self.seed)
+        k = min(self.dim + self.oversample, n, self.n_features)
+        omega = rng.standard_normal((self.n_features, k)).astype(np.float32)
+        y = np.empty((n, k), dtype=np.float32)
+        for start, end, a in self._batches(csr):
+            y[start:end] = a @ omega
+        for _ in range(self.n_iter):
+            q, _ = np.linalg.qr(y)
+            z = np.zeros((self.n_features, k), dtype=np.float32)
+            for start, end, a in self._batches(csr):
+                z += a.T @ q[start:end]
+            z, _ = np.linalg.qr(z)
+            for start, end, a in self._batches(csr):
+                y[start:end] = a @ z
+        q, _ = np.linalg.qr(y)
+
+        b = np.zeros((k, self.n_features), dtype=np.float32)
+        for start, end, a in self._batches(csr):
+            b += q[start:end].T @ a
+        u, s, vt = np.linalg.svd(b, full_matrices=False)
+        dim = min(self.dim, k)
+        self.components = vt[:dim].astype(np.float32)
+
+        # A @ V ≈ Q @ U @ S，无需再扫描一遍数据
+        embeddings = (q @ (u[:, :dim] * s[:dim])).astype(np.float32)
+        return _normalize_rows(embeddings)
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        """把新文本投影到已拟合的向量空间"""
+        if self.components is None:
+            raise RuntimeError("向量化器尚未拟合")
+        csr = self._sparse(texts)
+        out = np.empty((len(csr[0]) - 1, self.components.shape[0]), dtype=np.float32)
+        for start, end, a in self._batches(csr):
+            out[start:end] = a @ self.components.T
+        return _normalize_rows(out)
+
+    def save(self, path: str):
+        np.savez(path, idf=self.idf, components=self.components,
+                 params=np.array([self.dim, self.n_features, self.oversample,
+                                  self.n_iter, self.batch_size, self.seed]))
+
+    @classmethod
+    def load(cls, path: str) -> 'HashedTfidfEmbedder':
+        data = np.load(path)
+        embedder = cls(*[int(v) for v in data['params']])
+        embedder.idf = data['idf']
+        embedder.components = data['components']
+        return embedder
+
+
+class ModelEmbedder:
+    """基于 sentence-transformers 本地小模型的向量化器"""
+
+    def __init__(self, model_name: str = "all-MiniLM-L6-v2", batch_size: int = 256):
+        if not SENTENCE_TRANSFORMERS_AVAILABLE:
+            raise ImportError("ModelEmbedder 需要安装 sentence-transformers")
+        self.model_name = model_name
+        self.batch_size = batch_size
+        self.model = SentenceTransformer(model_name, device='cpu')
+
+    def fit_transform(self, texts: Sequence[str]) -> np.ndarray:
+        return self.transform(texts)
+
+    def transform(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = self.model.encode(list(texts), batch_size=self.batch_size,
+                                    convert_to_numpy=True, normalize_embeddings=True)
+        return vectors.astype(np.float32)
+
+
+class EmbeddingStore:
+    """内存映射的 float32 向量矩阵，行向量均已 L2 归一化"""
+
+    def __init__(self, path: str, mode: str = 'r'):
+        """
+        打开已有的向量文件
+
+        Args:
+            path: 文件前缀，对应 <path>.npy 与 <path>.ids.json
+            mode: 'r' 只读，'r+' 读写
+        """
+        self.path = path
+        self.vectors = np.load(path + '.npy', mmap_mode=mode)
+        with open(path + '.ids.json', encoding='utf-8') as f:
+            self.ids: List[str] = json.load(f)
+        self.row_of = {arxiv_id: i for i, arxiv_id in enumerate(self.ids)}
+
+    @classmethod
+    def create(cls, path: str, ids: List[str], vectors: np.ndarray) -> 'EmbeddingStore':
+        matrix = np.lib.format.open_memmap(path + '.npy', mode='w+', dtype=np.float32,
+                                           shape=vectors.shape)
+        matrix[:] = vectors
+        matrix.flush()
+        del matrix
+        with open(path + '.ids.json', 'w', encoding='utf-8') as f:
+            json.dump(ids, f)
+        logger.info(f"向量已保存到: {path}.npy ({vectors.shape[0]} x {vectors.shape[1]})")
+        return cls(path)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def append(self, ids: List[str], vectors: np.ndarray, chunk_size: int = 65536) -> 'EmbeddingStore':
+        """
+        追加新向量：写入临时文件后替换原文件，已有的行按块复制，不整体读入内存
+
+        Returns:
+            重新打开的向量存储
+        """
+        tmp = self.path + '.tmp'
+        shape = (len(self) + len(vectors), self.vectors.shape[1])
+        matrix = np.lib.format.open_memmap(tmp + '.npy', mode='w+', dtype=np.float32, shape=shape)
+        for start in range(0, len(self), chunk_size):
+            end = min(start + chunk_size, len(self))
+            matrix[start:end] = self.vectors[start:end]
+        matrix[len(self):] = vectors
+        matrix.flush()
+        del matrix
+        with open(tmp + '.ids.json', 'w', encoding='utf-8') as f:
+            json.dump(self.ids + list(ids), f)
+        os.replace(tmp + '.npy', self.path + '.npy')
+        os.replace(tmp + '.ids.json', self.path + '.ids.json')
+        logger.info(f"已追加 {len(ids)} 个向量到: {self.path}.npy，共 {shape[0]} 个")
+        return EmbeddingStore(self.path)
+
+    def topk(self, queries: np.ndarray, k: int = 10, chunk_size: int = 65536,
+             exclude_self: bool = False) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量余弦 Top-K
+
+        Args:
+            queries: (q, dim) 已归一化的查询向量
+            k: 每个查询返回的数量
+            chunk_size: 每次从内存映射读入的行数
+            exclude_self: 排除与查询完全相同（相似度≈1）的行
+
+        Returns:
+            (scores, rows)，形状均为 (q, k)，按相似度降序
+        """
+        queries = np.atleast_2d(queries).astype(np.float32)
+        n_queries = len(queries)
+        best_scores = np.full((n_queries, 0), -np.inf, dtype=np.float32)
+        best_rows = np.empty((n_queries, 0), dtype=np.int64)
+
+        for start in range(0, len(self), chunk_size):
+            chunk = np.asarray(self.vectors[start:start + chunk_size])
+            scores = queries @ chunk.T
+            if exclude_self:
+                scores[scores > 0.9999] = -np.inf
+            take = min(k, scores.shape[1])
+            part = np.argpartition(-scores, take - 1, axis=1)[:, :take]
+            best_scores = np.concatenate([best_scores, np.take_along_axis(scores, part, 1)], axis=1)
+            best_rows = np.concatenate([best_rows, part + start], axis=1)
+            if best_scores.shape[1] > k:
+                keep = np.argpartition(-best_scores, k - 1, axis=1)[:, :k]
+                best_scores = np.take_along_axis(best_scores, keep, 1)
+                best_rows = np.take_along_axis(best_rows, keep, 1)
+
+        order = np.argsort(-best_scores, axis=1)
+        return np.take_along_axis(best_scores, order, 1), np.take_along_axis(best_rows, order, 1)
+
+    def similar(self, arxiv_id: str, k: int = 10) -> List[Tuple[str, float]]:
+        """返回与某篇论文最相似的 k 篇论文"""
+        row = self.row_of[arxiv_id]
+        scores, rows = self.topk(self.vectors[row:row + 1], k + 1)
+        return [(self.ids[r], float(s)) for s, r in zip(scores[0], rows[0]) if r != row][:k]
+
+
+class MiniBatchKMeans:
+    def __init__(self, n_clusters: int = 50, batch_size: int = 4096, max_iter: int = 100,
+                 tol: float = 1e-4, seed: int = 0):
+        """
+        基于 NumPy 的 mini-batch k-means（球面版本，质心保持单位长度）
+
+        Args:
+            n_clusters: 聚类数
+            batch_size: 每次迭代抽样的向量数
+            max_iter: 最大迭代次数
+            tol: 质心平均移动量低于该值时提前停止
+            seed: 随机种子
+        """
+        self.n_clusters = n_clusters
+        self.batch_size = batch_size
+        self.max_iter = max_iter
+        self.tol = tol
+        self.seed = seed
+        self.centers: Optional[np.ndarray] = None
+
+    def _init_centers(self, sample: np.ndarray, rng) -> np.ndarray:
+        """贪心 k-means++ 初始化：每一步抽取若干候选，保留使总距离下降最多的一个"""
+        n_trials = 2 + int(math.log(self.n_clusters))
+        centers = [sample[rng.integers(len(sample))]]
+        dist = np.maximum(1 - sample @ centers[0], 0)
+        for _ in range(1, self.n_clusters):
+            total = dist.sum()
+            if total <= 0:
+                candidates = rng.integers(len(sample), size=1)
+            else:
+                candidates = rng.choice(len(sample), size=n_trials, p=dist / total)
+            candidate_dist = np.minimum(dist, np.maximum(1 - sample[candidates] @ sample.T, 0))
+            best = int(np.argmin(candidate_dist.sum(axis=1)))
+            centers.append(sample[candidates[best]])
+            dist = candidate_dist[best]
+        return np.array(centers, dtype=np.float32)
+
+    def fit(self, vectors: np.ndarray) -> 'MiniBatchKMeans':
+        rng = np.random.default_rng(self.seed)
+        n = len(vectors)
+        if n < self.n_clusters:
+            raise ValueError(f"样本数 {n} 少于聚类数 {self.n_clusters}")
+
+        sample_size = min(n, max(self.batch_size, 10 * self.n_clusters))
+        sample = np.asarray(vectors[np.sort(rng.choice(n, sample_size, replace=False))])
+        self.centers = self._init_centers(sample, rng)
+        counts = np.zeros(self.n_clusters, dtype=np.int64)
+
+        for iteration in range(self.max_iter):
+            batch_rows = np.sort(rng.choice(n, min(self.batch_size, n), replace=False))
+            batch = np.asarray(vectors[batch_rows])
+            similarity = batch @ self.centers.T
+            labels = np.argmax(similarity, axis=1)
+
+            previous = self.centers.copy()
+            batch_counts = np.bincount(labels, minlength=self.n_clusters)
+            empty = np.flatnonzero((counts + batch_counts) == 0)
+            if len(empty):
+                # 从未分到样本的质心移到本批中离已有质心最远的点上
+                farthest = np.argsort(similarity.max(axis=1))[:len(empty)]
+                self.centers[empty[:len(farthest)]] = batch[farthest]
+                similarity = batch @ self.centers.T
+                labels = np.argmax(similarity, axis=1)
+                batch_counts = np.bincount(labels, minlength=self.n_clusters)
+            sums = np.zeros_like(self.centers)
+            np.add.at(sums, labels, batch)
+            updated = batch_counts > 0
+            counts += batch_counts
+            # 每个质心的学习率为 本批数量 / 累计数量
+            rate = (batch_counts[updated] / counts[updated])[:, None].astype(np.float32)
+            means = sums[updated] / batch_counts[updated][:, None]
+            self.centers[updated] = (1 - rate) * self.centers[updated] + rate * means
+            self.centers = _normalize_rows(self.centers)
+
+            shift = np.linalg.norm(self.centers - previous, axis=1).mean()
+            if shift < self.tol:
+                logger.info(f"k-means 在第 {iteration + 1} 次迭代收敛")
+                break
+        return self
+
+    def predict(self, vectors: np.ndarray, chunk_size: int = 65536) -> np.ndarray:
+        labels = np.empty(len(vectors), dtype=np.int32)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = np.asarray(vectors[start:start + chunk_size])
+            labels[start:start + chunk_size] = np.argmax(chunk @ self.centers.T, axis=1)
+        return labels
+
+
+def label_clusters(labels: np.ndarray, papers: Sequence[Paper], top_n: int = 5) -> Dict[int, List[str]]:
+    """
+    用关键词标注每个聚类
+
+    词的得分为 聚类内词频 × log(聚类总数 / 含该词的聚类数)，
+    以突出聚类特有而不是全局常见的词。
+    """
+    cluster_counts: Dict[int, Counter] = {}
+    for cluster in np.unique(labels):
+        members = np.flatnonzero(labels == cluster)
+        cluster_counts[int(cluster)] = count_keywords(paper_text(papers[i]) for i in members)
+
+    n_clusters = len(cluster_counts)
+    cluster_df = Counter()
+    for counts in cluster_counts.values():
+        cluster_df.update(counts.keys())
+
+    result = {}
+    for cluster, counts in cluster_counts.items():
+        # 得分相同（例如只有一个聚类时全为 0）按聚类内词频排序
+        ranked = sorted(counts.items(),
+                        key=lambda item: (item[1] * math.log(n_clusters / cluster_df[item[0]]), item[1]),
+                        reverse=True)
+        result[cluster] = [word for word, _ in ranked[:top_n]]
+    return result
+
+
+def create_embedder(kind: str = 'auto', dim: int = 128, model_name: str = "all-MiniLM-L6-v2"):
+    """
+    创建向量化器
+
+    Args:
+        kind: 'tfidf'、'model'，或 'auto'（有本地模型时用模型，否则用哈希 TF-IDF）
+    """
+    if kind == 'model' or (kind == 'auto' and SENTENCE_TRANSFORMERS_AVAILABLE):
+        return ModelEmbedder(model_name)
+    return HashedTfidfEmbedder(dim=dim)
+
+
+def build(corpus_path: str, vectors_path: str, kind: str = 'auto', dim: int = 128,
+          rebuild: bool = False) -> EmbeddingStore:
+    """
+    为语料生成向量
+
+    已有向量文件时只为新论文生成向量并追加：哈希 TF-IDF 沿用上次保存的
+    IDF 和投影（<vectors>.model.npz），本地模型直接编码。语料变化较大、
+    需要重新拟合 IDF 和投影时使用 rebuild。
+
+    Args:
+        corpus_path: 语料文件
+        vectors_path: 向量文件前缀
+        kind: 向量化方式，见 create_embedder
+        dim: 哈希 TF-IDF 向量维度
+        rebuild: 忽略已有向量，全部重新生成
+
+    Returns:
+        向量存储
+    """
+    papers = load_corpus(corpus_path)
+    model_path = vectors_path + '.model.npz'
+    embedder = create_embedder(kind, dim=dim)
+    store = None
+    if not rebuild and os.path.exists(vectors_path + '.npy'):
+        if not isinstance(embedder, HashedTfidfEmbedder):
+            store = EmbeddingStore(vectors_path)
+        elif os.path.exists(model_path):
+            store = EmbeddingStore(vectors_path)
+            embedder = HashedTfidfEmbedder.load(model_path)
+
+    if store is not None:
+        new_papers = [p for p in papers if p.arxiv_id not in store.row_of]
+        if not new_papers:
+            logger.info("没有新论文需要生成向量")
+            return store
+        vectors = embedder.transform([paper_text(p) for p in new_papers])
+        if vectors.shape[1] == store.vectors.shape[1]:
+            return store.append([p.arxiv_id for p in new_papers], vectors)
+        logger.warning("向量维度与已有文件不一致，重新生成全部向量")
+
+    vectors = embedder.fit_transform([paper_text(p) for p in papers])
+    store = EmbeddingStore.create(vectors_path, [p.arxiv_id for p in papers], vectors)
+    if isinstance(embedder, HashedTfidfEmbedder):
+        embedder.save(model_path)
+    return store
+
+
+def main():
+    parser = argparse.ArgumentParser(description='摘要语义向量、相似检索与主题聚类')
+    parser.add_argument('command', choices=['build', 'similar', 'cluster'],
+                       help='build: 生成向量; similar: 相似论文; cluster: 主题聚类')
+    parser.add_argument('--corpus', default='papers_store.jsonl',
+                       help='语料文件 (.jsonl 或 .json，默认: papers_store.jsonl)')
+    parser.add_argument('--vectors', default='embeddings',
+                       help='向量文件前缀 (默认: embeddings)')
+    parser.add_argument('--embedder', choices=['auto', 'tfidf', 'model'], default='auto',
+                       help='向量化方式 (默认: auto)')
+    parser.add_argument('--dim', type=int, default=128,
+                       help='哈希 TF-IDF 向量维度 (默认: 128)')
+    parser.add_argument('--arxiv-id',
+                       help='similar 命令的查询论文')
+    parser.add_argument('--top-k', type=int, default=10,
+                       help='相似论文数量 (默认: 10)')
+    parser.add_argument('--clusters', type=int, default=50,
+                       help='聚类数 (默认: 50)')
+    parser.add_argument('--output', default='clusters.json',
+                       help='聚类结果文件 (默认: clusters.json)')
+    parser.add_argument('--rebuild', action='store_true',
+                       help='build 时重新拟合全部向量，而不是只为新论文增量生成')
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+    if args.command == 'build':
+        build(args.corpus, args.vectors, args.embedder, dim=args.dim, rebuild=args.rebuild)
+
+    elif args.command == 'similar':
+        if not args.arxiv_id:
+            parser.error('similar 需要 --arxiv-id')
+        store = EmbeddingStore(args.vectors)
+        for arxiv_id, score in store.similar(args.arxiv_id, k=args.top_k):
+            print(f"{arxiv_id}  {score:.3f}")
+
+    elif args.command == 'cluster':
+        store = EmbeddingStore(args.vectors)
+        papers = {p.arxiv_id: p for p in load_corpus(args.corpus)}
+        # 向量生成之后从语料中删除的论文不参与聚类
+        rows = [i for i, arxiv_id in enumerate(store.ids) if arxiv_id in papers]
+        if len(rows) < len(store):
+            logger.warning(f"{len(store) - len(rows)} 个向量在语料中找不到对应论文，已跳过")
+            vectors = np.asarray(store.vectors[rows])
+        else:
+            vectors = store.vectors
+        ids = [store.ids[i] for i in rows]
+        ordered = [papers[arxiv_id] for arxiv_id in ids]
+
+        kmeans = MiniBatchKMeans(n_clusters=args.clusters).fit(vectors)
+        labels = kmeans.predict(vectors)
+        cluster_labels = label_clusters(labels, ordered)
+        sizes = np.bincount(labels, minlength=args.clusters)
+
+        result = []
+        for cluster in np.argsort(-sizes):
+            if sizes[cluster] == 0:
+                continue
+            members = [ids[i] for i in np.flatnonzero(labels == cluster)]
+            result.append({'cluster': int(cluster), 'size': int(sizes[cluster]),
+                           'keywords': cluster_labels[int(cluster)], 'papers': members})
+            print(f"[{cluster:3d}] {sizes[cluster]:6d} 篇  {', '.join(cluster_labels[int(cluster)])}")
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        logger.info(f"聚类结果已保存到: {args.output}")
+
+
+if __name__ == "__main__":
+    main()
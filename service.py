@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+本地只读查询服务
+
+基于 asyncio 的轻量 HTTP 服务，直接读取已持久化的论文（守护模式的
+papers_store.jsonl，或 papers_info.json / multi_category_papers.json），
+提供关键词 Top-K、检索、栏目列表和词云图片，不会访问 arxiv.org。
+计算结果按 (查询, 语料版本) 缓存在内存 LRU 中，语料文件更新后自动失效；
+缓存同时限制条目数和总字节数，词云图片较大时会更早被淘汰。
+
+端点:
+    GET /health
+    GET /keywords?category=cs.CV&days=7&k=20
+    GET /search?q=diffusion+model&author=Jane+Doe&category=cs.CV&limit=20
+    GET /categories
+    GET /categories/<栏目>?limit=50&offset=0
+    GET /wordcloud.png?category=cs.CV&days=7&max_words=100
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+import tempfile
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, timedelta
+from http import HTTPStatus
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from authors import normalize_author
+from keywords import count_keywords, tokenize
+from paper import Paper
+from store import load_corpus
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+Response = Tuple[int, str, bytes]
+
+
+class Corpus:
+    """某一版本语料的内存索引"""
+
+    def __init__(self, papers: List[Paper], version: Tuple[int, int]):
+        self.version = version
+        self.papers = sorted(papers, key=lambda p: p.date, reverse=True)
+        self.by_category: Dict[str, List[int]] = defaultdict(list)
+        self.postings: Dict[str, List[int]] = defaultdict(list)
+        self.by_author: Dict[str, List[int]] = defaultdict(list)
+        for i, paper in enumerate(self.papers):
+            self.by_category[paper.category or ""].append(i)
+            for author in {normalize_author(name) for name in paper.authors}:
+                self.by_author[author].append(i)
+            for term in set(tokenize(paper.title + " " + paper.abstract)):
+                self.postings[term].append(i)
+
+    def select(self, category: Optional[str] = None, days: Optional[int] = None) -> List[Paper]:
+        """按栏目和最近天数筛选论文；指定 days 时没有日期的论文会被排除"""
+        indices = self.by_category.get(category, []) if category else range(len(self.papers))
+        papers = [self.papers[i] for i in indices]
+        if days is not None:
+            since = (date.today() - timedelta(days=days)).isoformat()
+            papers = [paper for paper in papers if paper.date and paper.date >= since]
+        return papers
+
+
+class QueryService:
+    def __init__(self, corpus_path: str, cache_size: int = 256,
+                 cache_bytes: int = 64 * 1024 * 1024):
+        """
+        初始化查询服务
+
+        Args:
+            corpus_path: 语料文件路径
+            cache_size: LRU 缓存的最大条目数
+            cache_bytes: LRU 缓存中响应体的最大总字节数
+        """
+        self.corpus_path = corpus_path
+        self.cache_size = cache_size
+        self.cache_bytes = cache_bytes
+        self.corpus: Optional[Corpus] = None
+        self._cache: "OrderedDict[tuple, Response]" = OrderedDict()
+        self._cached_bytes = 0
+        self._reload_lock = asyncio.Lock()
+        # 词云依赖 matplotlib 全局状态，放在单独的单线程执行器中生成
+        self._render_executor = ThreadPoolExecutor(max_workers=1)
+        self._crawler = None
+
+    def _file_version(self) -> Tuple[int, int]:
+        try:
+            stat = os.stat(self.corpus_path)
+        except FileNotFoundError:
+            return (0, 0)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    async def _current_corpus(self) -> Corpus:
+        version = self._file_version()
+        if self.corpus is None or self.corpus.version != version:
+            async with self._reload_lock:
+                if self.corpus is None or self.corpus.version != version:
+                    loop = asyncio.get_running_loop()
+                    papers = await loop.run_in_executor(None, self._load_papers)
+                    self.corpus = Corpus(papers, version)
+                    logger.info(f"语料已加载: {len(papers)} 篇论文")
+        return self.corpus
+
+    def _load_papers(self) -> List[Paper]:
+        if not os.path.exists(self.corpus_path):
+            return []
+        return load_corpus(self.corpus_path)
+
+    async def handle(self, path: str, params: Dict[str, str]) -> Response:
+        """处理一次查询，命中缓存时直接返回"""
+        corpus = await self._current_corpus()
+        key = (path, tuple(sorted(params.items())), corpus.version)
+        if params.get('days'):
+            # 按天数筛选的结果随日期变化，跨天后不能再命中缓存
+            key += (date.today().isoformat(),)
+        cached = self._cache.get(key)
+        if cached is not None:
+            self._cache.move_to_end(key)
+            return cached
+
+        response = await self._dispatch(corpus, path, params)
+        if response[0] == HTTPStatus.OK and path != '/health':
+            self._cache_put(key, response)
+        return response
+
+    def _cache_put(self, key: tuple, response: Response):
+        size = len(response[2])
+        if size > self.cache_bytes:
+            return
+        self._cache[key] = response
+        self._cached_bytes += size
+        while len(self._cache) > self.cache_size or self._cached_bytes > self.cache_bytes:
+            _, evicted = self._cache.popitem(last=False)
+            self._cached_bytes -= len(evicted[2])
+
+    async def _dispatch(self, corpus: Corpus, path: str, params: Dict[str, str]) -> Response:
+        try:
+            if path == '/health':
+                return _json({'papers': len(corpus.papers), 'cache_entries': len(self._cache)})
+            if path == '/keywords':
+                return self._keywords(corpus, params)
+            if path == '/search':
+                return self._search(corpus, params)
+            if path == '/categories':
+                return _json({c: len(ids) for c, ids in sorted(corpus.by_category.items())})
+            if path.startswith('/categories/'):
+                return self._category(corpus, path[len('/categories/'):], params)
+            if path == '/wordcloud.png':
+                return await self._wordcloud(corpus, params)
+        except ValueError as e:
+            return _error(HTTPStatus.BAD_REQUEST, f"参数错误: {e}")
+        return _error(HTTPStatus.NOT_FOUND, f"未知路径: {path}")
+
+    def _keywords(self, corpus: Corpus, params: Dict[str, str]) -> Response:
+        papers = corpus.select(params.get('category'), _int_param(params, 'days'))
+        counts = count_keywords(paper.title + " " + paper.abstract for paper in papers)
+        top_n = _int_param(params, 'k', 20)
+        return _json({
+            'papers': len(papers),
+            'keywords': [{'word': w, 'count': c} for w, c in counts.most_common(top_n)]
+        })
+
+    def _search(self, corpus: Corpus, params: Dict[str, str]) -> Response:
+        terms = tokenize(params.get('q', ""))
+        author = normalize_author(params.get('author', ""))
+        if not terms and not author:
+            raise ValueError("q 和 author 不能都为空")
+        # 取所有查询词（及作者）倒排列表的交集，从最短的列表开始
+        postings = [corpus.postings.get(t, []) for t in set(terms)]
+        if author:
+            postings.append(corpus.by_author.get(author, []))
+        category = params.get('category')
+        if category:
+            postings.append(corpus.by_category.get(category, []))
+        postings.sort(key=len)
+        matches = set(postings[0])
+        for ids in postings[1:]:
+            matches.intersection_update(ids)
+
+        limit = _int_param(params, 'limit', 20)
+        results = [corpus.papers[i].to_dict() for i in sorted(matches)[:limit]]
+        return _json({'total': len(matches), 'results': results})
+
+    def _category(self, corpus: Corpus, category: str, params: Dict[str, str]) -> Response:
+        category = unquote(category)
+        if category not in corpus.by_category:
+            return _error(HTTPStatus.NOT_FOUND, f"没有栏目 {category} 的论文")
+        offset = _int_param(params, 'offset', 0)
+        limit = _int_param(params, 'limit', 50)
+        ids = corpus.by_category[category][offset:offset + limit]
+        return _json({
+            'category': category,
+            'total': len(corpus.by_category[category]),
+            'papers': [corpus.papers[i].to_dict() for i in ids]
+        })
+
+    def _load_renderer(self) -> bool:
+        """在渲染线程中导入 arxiv_crawler（会加载 matplotlib），避免阻塞事件循环"""
+        if self._crawler is None:
+            import arxiv_crawler
+
+            if not arxiv_crawler.WORDCLOUD_AVAILABLE:
+                return False
+            self._crawler = arxiv_crawler.ArxivCrawler()
+        return True
+
+    async def _wordcloud(self, corpus: Corpus, params: Dict[str, str]) -> Response:
+        papers = corpus.select(params.get('category'), _int_param(params, 'days'))
+        max_words = _int_param(params, 'max_words', 100)
+        loop = asyncio.get_running_loop()
+        if not await loop.run_in_executor(self._render_executor, self._load_renderer):
+            return _error(HTTPStatus.NOT_IMPLEMENTED, "词云功能需要安装 wordcloud 和 matplotlib 包")
+
+        def render() -> Optional[bytes]:
+            fd, path = tempfile.mkstemp(suffix='.png')
+            os.close(fd)
+            try:
+                if not self._crawler.generate_wordcloud(papers, output_file=path, max_words=max_words):
+                    return None
+                with open(path, 'rb') as f:
+                    return f.read()
+            finally:
+                os.remove(path)
+
+        image = await loop.run_in_executor(self._render_executor, render)
+        if image is None:
+            return _error(HTTPStatus.UNPROCESSABLE_ENTITY, "没有足够的词汇生成词云")
+        return HTTPStatus.OK, 'image/png', image
+
+    async def serve_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        """处理一个 HTTP/1.1 连接，支持 keep-alive"""
+        try:
+            while True:
+                request_line = await reader.readline()
+                if not request_line:
+                    break
+                headers = {}
+                while True:
+                    line = await reader.readline()
+                    if line in (b'\r\n', b'\n', b''):
+                        break
+                    name, _, value = line.decode('latin-1').partition(':')
+                    headers[name.strip().lower()] = value.strip()
+
+                try:
+                    method, target, version = request_line.decode('latin-1').split()
+                except ValueError:
+                    break
+                if method not in ('GET', 'HEAD'):
+                    status, content_type, body = _error(HTTPStatus.METHOD_NOT_ALLOWED, "只支持 GET")
+                else:
+                    url = urlsplit(target)
+                    try:
+                        status, content_type, body = await self.handle(url.path, dict(parse_qsl(url.query)))
+                    except Exception as e:
+                        logger.exception(f"处理请求 {target} 失败")
+                        status, content_type, body = _error(HTTPStatus.INTERNAL_SERVER_ERROR,
+                                                            f"内部错误: {e}")
+
+                keep_alive = (version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close')
+                head = (f"HTTP/1.1 {int(status)} {HTTPStatus(status).phrase}\r\n"
+                        f"Content-Type: {content_type}\r\n"
+                        f"Content-Length: {len(body)}\r\n"
+                        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+                writer.write(head.encode('latin-1'))
+                if method != 'HEAD':
+                    writer.write(body)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve(self, host: str = "127.0.0.1", port: int = 8000):
+        server = await asyncio.start_server(self.serve_connection, host, port)
+        logger.info(f"查询服务已启动: http://{host}:{port}，语料: {self.corpus_path}")
+        async with server:
+            await server.serve_forever()
+
+
+def _int_param(params: Dict[str, str], name: str, default: Optional[int] = None) -> Optional[int]:
+    value = params.get(name)
+    if value is None or value == "":
+        return default
+    return int(value)
+
+
+def _json(data) -> Response:
+    return HTTPStatus.OK, 'application/json; charset=utf-8', json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+
+def _error(status: HTTPStatus, message: str) -> Response:
+    body = json.dumps({'error': message}, ensure_ascii=False).encode('utf-8')
+    return status, 'application/json; charset=utf-8', body
+
+
+def main():
+    parser = argparse.ArgumentParser(description='arXiv 论文本地查询服务')
+    parser.add_argument('--corpus', default='papers_store.jsonl',
+                       help='语料文件 (.jsonl 或 .json，默认: papers_store.jsonl)')
+    parser.add_argument('--host', default='127.0.0.1',
+                       help='监听地址 (默认: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8000,
+                       help='监听端口 (默认: 8000)')
+    parser.add_argument('--cache-size', type=int, default=256,
+                       help='结果缓存条目数 (默认: 256)')
+    parser.add_argument('--cache-mb', type=float, default=64,
+                       help='结果缓存的最大内存/MB (默认: 64)')
+    args = parser.parse_args()
+
+    service = QueryService(args.corpus, cache_size=args.cache_size,
+                           cache_bytes=int(args.cache_mb * 1024 * 1024))
+    try:
+        asyncio.run(service.serve(args.host, args.port))
+    except KeyboardInterrupt:
+        logger.info("查询服务已停止")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+论文持久化存储
+
+PaperStore 把论文以 JSON Lines 格式追加写入单个文件，每行一篇。
+追加写入不需要重写已有内容，适合守护进程持续写入；读取端可以通过
+version 判断文件是否有新数据。load_corpus 统一读取 JSON Lines 存储和
+单栏目 / 多栏目 JSON 结果，供查询服务和语义分析等离线工具使用。
+"""
+
+import json
+import logging
+import os
+import threading
+from typing import Dict, Iterable, Iterator, List, Set, Tuple, Union
+
+from paper import Paper
+
+logger = logging.getLogger(__name__)
+
+
+class PaperStore:
+    def __init__(self, path: str = "papers_store.jsonl"):
+        """
+        初始化论文存储
+
+        Args:
+            path: JSON Lines 文件路径
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+    @property
+    def version(self) -> Tuple[int, int]:
+        """文件版本 (mtime_ns, size)，文件不存在时为 (0, 0)"""
+        try:
+            stat = os.stat(self.path)
+        except FileNotFoundError:
+            return (0, 0)
+        return (stat.st_mtime_ns, stat.st_size)
+
+    def append(self, papers: Iterable[Union[Paper, Dict]]) -> int:
+        """
+        追加写入论文
+
+        Returns:
+            写入的论文数量
+        """
+        lines = []
+        for paper in papers:
+            data = paper.to_dict() if isinstance(paper, Paper) else paper
+            lines.append(json.dumps(data, ensure_ascii=False))
+        if not lines:
+            return 0
+
+        with self._lock:
+            with open(self.path, 'a+b') as f:
+                # 上次写入中途中断时，末尾残留的半行单独成行，不与新记录粘连
+                if f.tell() > 0:
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b'\n':
+                        f.write(b'\n')
+                f.write(('\n'.join(lines) + '\n').encode('utf-8'))
+        logger.info(f"已追加 {len(lines)} 篇论文到: {self.path}")
+        return len(lines)
+
+    def __iter__(self) -> Iterator[Paper]:
+        """
+        逐篇读取论文
+
+        没有换行结尾的最后一行可能正在被写入（或写入时进程崩溃），直接忽略；
+        中间无法解析的行记录警告后跳过。
+        """
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, encoding='utf-8', errors='replace') as f:
+            for line_no, line in enumerate(f, 1):
+                if not line.endswith('\n'):
+                    break
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError:
+                    logger.warning(f"{self.path} 第 {line_no} 行不是完整的 JSON，已跳过")
+                    continue
+                yield Paper.from_dict(data)
+
+    def load(self) -> List[Paper]:
+        """读取全部论文，同一 arXiv ID 只保留最后一次写入的记录"""
+        papers = {}
+        for paper in self:
+            papers[paper.arxiv_id] = paper
+        return list(papers.values())
+
+    def arxiv_ids(self) -> Set[str]:
+        return {paper.arxiv_id for paper in self}
+
+
+def load_corpus(path: str) -> List[Paper]:
+    """读取语料文件，支持 JSON Lines 存储、单栏目和多栏目 JSON 结果"""
+    if path.endswith('.jsonl'):
+        return PaperStore(path).load()
+
+    with open(path, encoding='utf-8') as f:
+        data = json.load(f)
+    if isinstance(data, dict):
+        # 多栏目结果：从 category_papers 中恢复每篇论文的栏目
+        papers = {}
+        for category, items in data.get('category_papers', {}).items():
+            for item in items:
+                paper = Paper.from_dict(item)
+                paper.category = paper.category or category
+                papers.setdefault(paper.arxiv_id, paper)
+        return list(papers.values())
+    return [Paper.from_dict(item) for item in data]
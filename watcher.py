@@ -0,0 +1,219 @@
+"""
+守护（watch）模式
+
+长期运行并复用同一个 ArxivCrawler（及其 requests 会话和连接池），按各栏目
+自己的时间表轮询列表页，只把新论文依次送入关键词统计、存储和下载。
+所有工作通过一个内部优先级队列分发；收到 SIGTERM/SIGINT 后停止轮询，
+把队列中已有的工作处理完再退出。
+"""
+
+import itertools
+import logging
+import queue
+import signal
+import threading
+import time
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from keywords import count_keywords
+from paper import Paper
+from store import PaperStore
+
+try:
+    from zoneinfo import ZoneInfo
+    ARXIV_TZ = ZoneInfo('America/New_York')
+except Exception:
+    # 缺少时区数据时退回固定的美东标准时间
+    ARXIV_TZ = timezone(timedelta(hours=-5))
+
+logger = logging.getLogger(__name__)
+
+# arXiv 在美东时间周日至周四 20:00 发布新论文
+ANNOUNCE_HOUR = 20
+ANNOUNCE_WEEKDAYS = {6, 0, 1, 2, 3}
+
+# 优先级：数值越小越先处理。先处理已经拿到的论文，再发起新的轮询
+PRIORITY_PROCESS = 0
+PRIORITY_DOWNLOAD = 1
+PRIORITY_POLL = 2
+
+
+def next_announcement(after: datetime) -> datetime:
+    """返回 after 之后的下一次 arXiv 发布时间"""
+    local = after.astimezone(ARXIV_TZ)
+    candidate = local.replace(hour=ANNOUNCE_HOUR, minute=0, second=0, microsecond=0)
+    while candidate <= local or candidate.weekday() not in ANNOUNCE_WEEKDAYS:
+        candidate += timedelta(days=1)
+    return candidate
+
+
+class CategorySchedule:
+    """单个栏目的轮询时间表"""
+
+    __slots__ = ('category', 'interval', 'offset', 'next_run')
+
+    def __init__(self, category: str, interval: float = 0, offset: float = 0):
+        """
+        Args:
+            category: 栏目代码
+            interval: 轮询间隔（秒），0 表示在每次 arXiv 发布后轮询
+            offset: 相对发布时间的延后秒数，用于错开各栏目的请求
+        """
+        self.category = category
+        self.interval = interval
+        self.offset = offset
+        self.next_run = 0.0  # 启动后立即轮询一次
+
+    def advance(self, now: float):
+        if self.interval > 0:
+            self.next_run = now + self.interval
+        else:
+            announce = next_announcement(datetime.fromtimestamp(now, timezone.utc))
+            self.next_run = announce.timestamp() + self.offset
+
+
+class CrawlWatcher:
+    def __init__(self, crawler, categories: List[str], store: PaperStore,
+                 max_papers: int = 200, poll_interval: float = 0, stagger: float = 60,
+                 download: bool = False, download_dir: str = "papers",
+                 author_index=None, author_index_path: Optional[str] = None):
+        """
+        初始化守护模式
+
+        Args:
+            crawler: 复用的 ArxivCrawler 实例
+            categories: 要轮询的栏目列表
+            store: 新论文写入的存储
+            max_papers: 每次轮询读取的最大论文数
+            poll_interval: 轮询间隔（秒），0 表示对齐 arXiv 每日发布时间
+            stagger: 相邻栏目之间错开的秒数
+            download: 是否下载新论文的 PDF
+            download_dir: 下载目录
+            author_index: 可选的 AuthorIndex，新论文会增量加入
+            author_index_path: author_index 的保存路径
+        """
+        self.crawler = crawler
+        self.store = store
+        self.max_papers = max_papers
+        self.download = download
+        self.download_dir = download_dir
+        self.author_index = author_index
+        self.author_index_path = author_index_path
+        self.schedules = [
+            CategorySchedule(category, poll_interval, offset=i * stagger)
+            for i, category in enumerate(categories)
+        ]
+
+        if crawler.seen is not None:
+            self.seen = crawler.seen
+            if not len(self.seen):
+                # 首次启用已见集合时，从已有存储导入
+                self.seen.update(paper.arxiv_id for paper in store)
+        else:
+            self.seen = store.arxiv_ids()
+        # 已交给 process 但还没写入存储的 ID；写入成功后才加入 seen，
+        # 处理失败时从这里移除，下次轮询会重新拿到这些论文
+        self._pending = set()
+        self.keyword_counts: Dict[str, Counter] = defaultdict(Counter)
+        self.stats = Counter()
+
+        self._queue: queue.PriorityQueue = queue.PriorityQueue()
+        self._seq = itertools.count()
+        self._stop = threading.Event()
+
+    def submit(self, priority: int, kind: str, payload):
+        self._queue.put((priority, next(self._seq), kind, payload))
+
+    def stop(self, *_):
+        """请求停止：不再轮询，处理完队列中的工作后退出"""
+        if not self._stop.is_set():
+            logger.info("收到停止信号，处理完队列中的工作后退出...")
+            self._stop.set()
+
+    def install_signal_handlers(self):
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+
+    def run(self):
+        """运行调度循环，直到 stop() 被调用"""
+        logger.info(f"进入守护模式，轮询栏目: {', '.join(s.category for s in self.schedules)}，"
+                    f"已知论文 {len(self.seen)} 篇")
+        worker = threading.Thread(target=self._work, name='watch-worker')
+        worker.start()
+
+        while not self._stop.is_set():
+            now = time.time()
+            for schedule in self.schedules:
+                if schedule.next_run <= now:
+                    self.submit(PRIORITY_POLL, 'poll', schedule.category)
+                    schedule.advance(now)
+            wait = min(s.next_run for s in self.schedules) - time.time()
+            self._stop.wait(min(max(wait, 0), 60))
+
+        worker.join()
+        logger.info(f"守护模式已退出: {dict(self.stats)}")
+
+    def _work(self):
+        while True:
+            try:
+                _, _, kind, payload = self._queue.get(timeout=1)
+            except queue.Empty:
+                if self._stop.is_set():
+                    return
+                continue
+
+            try:
+                if kind == 'poll':
+                    if not self._stop.is_set():
+                        self._poll(payload)
+                elif kind == 'process':
+                    self._process(*payload)
+                elif kind == 'download':
+                    self._download(payload)
+            except Exception as e:
+                logger.error(f"处理任务 {kind} 失败: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _poll(self, category: str):
+        papers = self.crawler.get_papers_from_category(category, max_papers=self.max_papers)
+        # 设置了 crawler.seen 时已见条目在解析阶段就被跳过，这里只需排除处理中的论文
+        new_papers = [paper for paper in papers
+                      if paper.arxiv_id not in self.seen and paper.arxiv_id not in self._pending]
+        self._pending.update(paper.arxiv_id for paper in new_papers)
+        self.stats['polls'] += 1
+        logger.info(f"栏目 {category} 轮询完成，新论文 {len(new_papers)} 篇")
+        if new_papers:
+            self.submit(PRIORITY_PROCESS, 'process', (category, new_papers))
+
+    def _process(self, category: str, papers: List[Paper]):
+        try:
+            self.store.append(papers)
+            self.seen.update(paper.arxiv_id for paper in papers)
+        finally:
+            self._pending.difference_update(paper.arxiv_id for paper in papers)
+        self.stats['papers'] += len(papers)
+
+        counts = self.keyword_counts[category]
+        counts.update(count_keywords(paper.title + " " + paper.abstract for paper in papers))
+        top = ', '.join(f"{word}({count})" for word, count in counts.most_common(10))
+        logger.info(f"栏目 {category} 累计关键词: {top}")
+
+        if self.author_index is not None:
+            self.author_index.add_papers(papers)
+            if self.author_index_path:
+                self.author_index.save(self.author_index_path)
+
+        if self.download:
+            downloaded = self.crawler.downloaded
+            pending = [paper for paper in papers if downloaded is None or paper.arxiv_id not in downloaded]
+            self.crawler.progress.stage('downloads', unit='paper').add_total(len(pending))
+            for paper in pending:
+                self.submit(PRIORITY_DOWNLOAD, 'download', paper)
+
+    def _download(self, paper: Paper):
+        if self.crawler.download_paper(paper, self.download_dir):
+            self.stats['downloads'] += 1
+        self.crawler._throttle(self.crawler.progress.stage('downloads', unit='paper'))